@@ -0,0 +1,178 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+
+class LocalCache:
+    """
+    Least recently used entries of one process, each valid until its own
+    expiry time. Thread safe; counts hits and misses.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] <= time.time():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, expires):
+        with self.lock:
+            self.entries[key] = (value, expires)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+        }
+
+
+class UserCache(LocalCache):
+    """
+    Field values of recently authenticated users by their ids, options
+    are read from `settings.AUTH_USER_CACHE`. Every hit builds a fresh
+    instance, so a request can not change the user seen by another one.
+    """
+
+    def __init__(self):
+        super().__init__(self.options.get('MAX_SIZE', 1000))
+
+    @property
+    def options(self):
+        return getattr(settings, 'AUTH_USER_CACHE', {})
+
+    @property
+    def enabled(self):
+        return self.options.get('ENABLED', True)
+
+    def get_user(self, model, user_id):
+        values = self.get(user_id)
+        if values is None:
+            return None
+        return model.from_db(
+            DEFAULT_DB_ALIAS, [field.attname for field in
+                               model._meta.concrete_fields], values)
+
+    def set_user(self, user_id, user):
+        values = [getattr(user, field.attname)
+                  for field in user._meta.concrete_fields]
+        self.set(user_id, values,
+                 time.time() + self.options.get('TIMEOUT', 60))
+
+
+class TokenCache(LocalCache):
+    """
+    Validated access tokens by a digest of the raw token, each kept until
+    the token expires; options are read from `settings.AUTH_TOKEN_CACHE`.
+    The time spent on verifications tells how much the hits saved.
+    """
+
+    def __init__(self):
+        super().__init__(self.options.get('MAX_SIZE', 1000))
+        self.verifications = 0
+        self.verification_time = 0.0
+
+    @property
+    def options(self):
+        return getattr(settings, 'AUTH_TOKEN_CACHE', {})
+
+    @property
+    def enabled(self):
+        return self.options.get('ENABLED', True)
+
+    def add_verification(self, duration):
+        with self.lock:
+            self.verifications += 1
+            self.verification_time += duration
+
+    def clear(self):
+        super().clear()
+        self.verifications = 0
+        self.verification_time = 0.0
+
+    def stats(self):
+        stats = super().stats()
+        average = (self.verification_time / self.verifications
+                   if self.verifications else 0.0)
+        stats['time_saved'] = round(self.hits * average, 6)
+        return stats
+
+
+user_cache = UserCache()
+token_cache = TokenCache()
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication which skips the signature check of a token seen
+    before, taking it from `token_cache`, and takes the user from
+    `user_cache` instead of loading the row on every request. A saved or
+    deleted user is dropped from the cache of the process by a receiver,
+    the other processes see the change once the entry times out.
+    """
+
+    def get_validated_token(self, raw_token):
+        if not token_cache.enabled:
+            return super().get_validated_token(raw_token)
+        key = hashlib.sha256(raw_token).hexdigest()
+        validated_token = token_cache.get(key)
+        if validated_token is None:
+            started = time.perf_counter()
+            validated_token = super().get_validated_token(raw_token)
+            token_cache.add_verification(time.perf_counter() - started)
+            token_cache.set(key, validated_token, validated_token['exp'])
+        return validated_token
+
+    def get_user(self, validated_token):
+        if not user_cache.enabled:
+            return super().get_user(validated_token)
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification'))
+        user = user_cache.get_user(self.user_model, user_id)
+        if user is None:
+            user = super().get_user(validated_token)
+            user_cache.set_user(user_id, user)
+        elif not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive')
+        return user
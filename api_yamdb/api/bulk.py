@@ -0,0 +1,90 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .authentication import user_cache
+from reviews.deletion import CHUNK_SIZE, delete_comments, delete_reviews
+from reviews.models import Comment, Review
+from users.models import User
+
+SET_ROLE = 'set_role'
+DEACTIVATE = 'deactivate'
+DELETE = 'delete'
+
+OPERATIONS = (
+    (SET_ROLE, 'set role'),
+    (DEACTIVATE, 'deactivate'),
+    (DELETE, 'delete'),
+)
+
+
+def forget_users(user_ids):
+    """Drop the users from the user cache once the change is committed."""
+    def forget():
+        for user_id in user_ids:
+            user_cache.delete(user_id)
+    transaction.on_commit(forget)
+
+
+def delete_users(user_ids, chunk_size=CHUNK_SIZE):
+    """
+    Delete the users with their comments and reviews, fixing the counters
+    like `purge_user` does. Returns the titles whose responses changed.
+    """
+    titles = set(
+        Review.objects.filter(Q(author_id__in=user_ids)
+                              | Q(comments__author_id__in=user_ids))
+        .order_by().values_list('title_id', flat=True).distinct())
+    delete_comments(Comment.objects.filter(author_id__in=user_ids),
+                    chunk_size, count_removed=True)
+    delete_reviews(Review.objects.filter(author_id__in=user_ids),
+                   chunk_size, count_removed=True)
+    User.objects.filter(pk__in=user_ids).delete()
+    return sorted(titles)
+
+
+def bulk_update_users(usernames, operation, role=None, acting_user=None):
+    """
+    Apply the operation to the users with the usernames by set-based
+    statements in one transaction. Returns the result of every username
+    and the cache entries invalidated by the change.
+
+    The acting admin is skipped, so they can not lock themselves out;
+    with ASYNC_DELETION deleted users are only hidden, as by `destroy`.
+    """
+    results = {username: 'not_found' for username in usernames}
+    invalidated = {'users': [], 'titles': []}
+    with transaction.atomic():
+        users = (User.objects.filter(username__in=usernames,
+                                     deleted_at__isnull=True)
+                 .select_for_update()
+                 .values_list('pk', 'username', 'role', 'is_active'))
+        changed = {}
+        for user_id, username, user_role, is_active in users:
+            if acting_user is not None and user_id == acting_user.pk:
+                results[username] = 'skipped'
+            elif (operation == SET_ROLE and user_role == role
+                  or operation == DEACTIVATE and not is_active):
+                results[username] = 'unchanged'
+            else:
+                changed[user_id] = username
+        queryset = User.objects.filter(pk__in=changed)
+        status = 'updated'
+        if operation == SET_ROLE:
+            queryset.update(role=role)
+        elif operation == DEACTIVATE:
+            queryset.update(is_active=False)
+        elif getattr(settings, 'ASYNC_DELETION', False):
+            # Tokens of an inactive user are refused right away.
+            queryset.update(deleted_at=timezone.now(), is_active=False)
+            status = 'scheduled'
+        elif changed:
+            invalidated['titles'] = delete_users(list(changed))
+            status = 'deleted'
+        for username in changed.values():
+            results[username] = status
+        forget_users(list(changed))
+        invalidated['users'] = sorted(changed.values())
+    return ([{'username': username, 'result': result}
+             for username, result in results.items()], invalidated)
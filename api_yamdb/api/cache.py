@@ -0,0 +1,187 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+TAG_PREFIX = 'api-tag:'
+# Changed by every invalidation, tells whether any tag moved meanwhile.
+WRITES_KEY = TAG_PREFIX + '*'
+RESPONSE_PREFIX = 'api-response:'
+
+
+class ResponseCache:
+    """
+    Serialized response data stored in one of the CACHES and tagged by
+    the objects it was built from.
+
+    Every tag has a version token in the same cache. An entry remembers
+    the tokens of its tags when it is stored and is only served while all
+    of them are unchanged, so invalidating a tag drops exactly the entries
+    built from it. Since the tokens live next to the entries, a file or
+    database cache shares both the data and the invalidations between
+    worker processes.
+    """
+
+    @property
+    def options(self):
+        return getattr(settings, 'API_RESPONSE_CACHE', {})
+
+    @property
+    def enabled(self):
+        return self.options.get('ENABLED', True)
+
+    @property
+    def timeout(self):
+        return self.options.get('TIMEOUT', 300)
+
+    @property
+    def cache(self):
+        return caches[self.options.get('CACHE', 'default')]
+
+    def make_key(self, request):
+        role = request.user.role if request.user.is_authenticated else ''
+        query = sorted(request.query_params.lists())
+        raw = (f'{request.method}:{request.get_host()}{request.path}:'
+               f'{query}:{role}')
+        return RESPONSE_PREFIX + hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    def get_versions(self, tags):
+        """Current version tokens of the tags, created where missing."""
+        return self.get_tokens([TAG_PREFIX + tag for tag in tags])
+
+    def get_writes(self):
+        """Token of the latest invalidation of any tag."""
+        return self.get_tokens([WRITES_KEY])[WRITES_KEY]
+
+    def get_tokens(self, keys):
+        versions = self.cache.get_many(keys)
+        for key in keys:
+            if key not in versions:
+                self.cache.add(key, uuid.uuid4().hex, None)
+                versions[key] = self.cache.get(key)
+        return versions
+
+    def get(self, key):
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        versions, data = entry
+        if self.cache.get_many(list(versions)) != versions:
+            return None
+        return data
+
+    def set(self, key, data, versions):
+        self.cache.set(key, (versions, data), self.timeout)
+
+    def invalidate(self, *tags):
+        """Drop every entry tagged by any of the tags once committed."""
+        keys = {TAG_PREFIX + tag: uuid.uuid4().hex for tag in tags}
+        keys[WRITES_KEY] = uuid.uuid4().hex
+        transaction.on_commit(lambda: self.cache.set_many(keys, None))
+
+
+response_cache = ResponseCache()
+
+
+class CachedResponseMixin:
+    """
+    Serves `list` of a viewset from the response cache.
+
+    `cache_tags` are the collection tags of the endpoint, dropped whenever
+    an object is added or removed; `get_object_tags` lists the tags of a
+    single serialized object.
+    """
+    cache_tags = ()
+
+    def get_object_tags(self, item):
+        return ()
+
+    def get_response_tags(self, data):
+        items = data.get('results', [data]) if isinstance(data, dict) else data
+        tags = set()
+        for item in items:
+            tags.update(self.get_object_tags(item))
+        return tags
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not response_cache.enabled:
+            return handler(request, *args, **kwargs)
+        key = response_cache.make_key(request)
+        data = response_cache.get(key)
+        if data is not None:
+            return Response(data)
+        # The collection versions are taken before the data is read, so a
+        # change committed in between does not leave a stale entry behind.
+        # The object tags are only known from the data: when anything was
+        # invalidated before their versions were read, they may be newer
+        # than the data and the response is not stored.
+        writes = response_cache.get_writes()
+        versions = response_cache.get_versions(self.cache_tags)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            versions.update(response_cache.get_versions(
+                self.get_response_tags(response.data)))
+            if response_cache.get_writes() == writes:
+                response_cache.set(key, response.data, versions)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedObjectMixin(CachedResponseMixin):
+    """Serves `retrieve` from the response cache as well."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs)
+
+
+class ConditionalGetMixin:
+    """
+    Gives `list` and `retrieve` a weak ETag made of the version tokens of
+    the tags from `get_etag_tags`, so an unchanged resource is answered
+    with 304 Not Modified before any serialization is run.
+
+    The tokens live in the cache of `API_RESPONSE_CACHE`. With the default
+    LocMemCache every process has its own, so ETags and invalidations are
+    only consistent with a single worker process; more workers need a
+    shared backend such as FileBasedCache or DatabaseCache.
+    """
+
+    def get_etag_tags(self):
+        return ()
+
+    def get_etag(self, request):
+        tags = self.get_etag_tags()
+        if not tags:
+            return None
+        versions = sorted(response_cache.get_versions(tags).items())
+        raw = f'{request.get_full_path()}:{versions}'
+        return 'W/"%s"' % hashlib.md5(raw.encode('utf-8')).hexdigest()
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag = self.get_etag(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+        client_etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+        if etag in client_etags:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,56 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import serializers
+
+from reviews.models import Comment, Review
+
+CHUNK_SIZE = 500
+
+REVIEW_FIELDS = ('id', 'author__username', 'text', 'score', 'pub_date',
+                 'comment_count')
+COMMENT_FIELDS = ('id', 'review_id', 'author__username', 'text', 'pub_date')
+
+
+class ExportEncoder(DjangoJSONEncoder):
+    """Formats dates the same way the API responses do."""
+    datetime_field = serializers.DateTimeField()
+
+    def default(self, o):
+        if hasattr(o, 'tzinfo'):
+            return self.datetime_field.to_representation(o)
+        return super().default(o)
+
+
+def export_line(kind, row):
+    row = {('author' if key == 'author__username' else key): value
+           for key, value in row.items()}
+    return json.dumps({'type': kind, **row}, cls=ExportEncoder,
+                      ensure_ascii=False) + '\n'
+
+
+def export_title(title, chunk_size=CHUNK_SIZE):
+    """
+    Newline delimited JSON of the title, followed by every review, each
+    followed by its comments.
+
+    Reviews and comments are read by two cursors ordered the same way
+    and merged, so the export takes two queries and holds no more than
+    a chunk of rows in memory whatever the size of the title.
+    """
+    yield export_line('title', {'id': title.pk, 'name': title.name,
+                                'year': title.year})
+    reviews = (Review.objects.filter(title_id=title.pk)
+               .order_by('pub_date', 'id')
+               .values(*REVIEW_FIELDS)
+               .iterator(chunk_size=chunk_size))
+    comments = (Comment.objects.filter(review__title_id=title.pk)
+                .order_by('review__pub_date', 'review_id', 'pub_date', 'id')
+                .values(*COMMENT_FIELDS)
+                .iterator(chunk_size=chunk_size))
+    comment = next(comments, None)
+    for review in reviews:
+        yield export_line('review', review)
+        while comment is not None and comment['review_id'] == review['id']:
+            yield export_line('comment', comment)
+            comment = next(comments, None)
@@ -1,6 +1,12 @@
 import django_filters
+from django.db.models import Count
 
-from reviews.models import Title
+from reviews.models import GenreTitle, Title
+from reviews.search import search_titles
+
+
+class CharInFilter(django_filters.BaseInFilter, django_filters.CharFilter):
+    """Comma separated list of values: `?genre=drama,comedy`."""
 
 
 class TitleFilter(django_filters.FilterSet):
@@ -8,12 +14,41 @@ class TitleFilter(django_filters.FilterSet):
     Gives an option to filtrate the fields below when you make a get-request 
     to find a title which matches to your search.
     """
-    category = django_filters.CharFilter(field_name='category__slug')
-    genre = django_filters.CharFilter(field_name='genre__slug')
+    ANY = 'any'
+    ALL = 'all'
+
+    category = CharInFilter(field_name='category__slug')
+    genre = CharInFilter(method='filter_genre')
+    genre_mode = django_filters.ChoiceFilter(
+        choices=((ANY, ANY), (ALL, ALL)), method='filter_genre_mode')
     name = django_filters.CharFilter(
         field_name='name', lookup_expr='icontains')
     year = django_filters.CharFilter(field_name='year')
+    year_min = django_filters.NumberFilter(
+        field_name='year', lookup_expr='gte')
+    year_max = django_filters.NumberFilter(
+        field_name='year', lookup_expr='lte')
+    q = django_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ['name', 'year', 'genre', 'category']
+        fields = ['name', 'year', 'genre', 'category', 'q']
+
+    def filter_genre(self, queryset, name, value):
+        """
+        Titles with any of the genres, or with all of them when
+        `genre_mode=all` is given.
+        """
+        links = (GenreTitle.objects.filter(genre__slug__in=value)
+                 .values('title_id'))
+        if self.form.cleaned_data.get('genre_mode') == self.ALL:
+            links = (links.annotate(genres=Count('genre_id', distinct=True))
+                     .filter(genres=len(set(value))).values('title_id'))
+        return queryset.filter(id__in=links)
+
+    def filter_genre_mode(self, queryset, name, value):
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        """Full-text search by name and description, best matches first."""
+        return search_titles(queryset, value)
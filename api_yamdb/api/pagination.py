@@ -0,0 +1,188 @@
+import base64
+import datetime as dt
+import json
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ParseError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginates by the values of the last row seen instead of an OFFSET.
+
+    `ordering` lists the fields the rows are sorted by in ascending order,
+    the last one has to be unique. Every page is a single range scan over
+    an index on these fields, no matter how deep the client goes. The
+    total count is only calculated when the client asks for it. Query
+    parameters in `ordering_query_params` order the rows their own way,
+    which a cursor can not follow, so they are refused.
+    """
+    ordering = ('id',)
+    ordering_query_params = ()
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = 'cursor'
+    count_query_param = 'with_count'
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        for param in self.ordering_query_params:
+            if param in request.query_params:
+                raise ParseError(
+                    f'`{param}` can not be used with cursor pagination.')
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.position, self.reverse = self.decode_cursor(
+            request, queryset.model)
+        self.count = None
+        if request.query_params.get(self.count_query_param) in (
+                'true', 'True', '1'):
+            self.count = queryset.count()
+
+        if self.reverse:
+            queryset = queryset.order_by(
+                *('-' + field for field in self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if self.position is not None:
+            queryset = queryset.filter(
+                self.position_filter(self.position, self.reverse))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.reverse:
+            results.reverse()
+            self.has_previous = has_more
+            self.has_next = self.position is not None
+        else:
+            self.has_next = has_more
+            self.has_previous = self.position is not None
+        self.page = results
+        return results
+
+    def position_filter(self, position, reverse):
+        """Rows strictly after (or before) the position in the ordering."""
+        lookup = 'lt' if reverse else 'gt'
+        condition = Q()
+        for index, field in enumerate(self.ordering):
+            step = Q(**{f'{field}__{lookup}': position[index]})
+            for previous, value in zip(self.ordering[:index], position):
+                step &= Q(**{previous: value})
+            condition |= step
+        # The redundant bound on the first field lets the database seek the
+        # index instead of scanning it from the start.
+        return Q(**{f'{self.ordering[0]}__{lookup}e': position[0]}) & condition
+
+    def get_position(self, row):
+        if isinstance(row, dict):
+            return [row[field] for field in self.ordering]
+        return [getattr(row, field) for field in self.ordering]
+
+    def decode_cursor(self, request, model):
+        """
+        Position and direction of the cursor, every value converted by the
+        model field it belongs to, so a crafted cursor can not reach the
+        query.
+        """
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            reverse, position = json.loads(
+                base64.urlsafe_b64decode(encoded.encode('ascii')))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if (reverse not in (0, 1) or not isinstance(position, list)
+                or len(position) != len(self.ordering)
+                or None in position):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [model._meta.get_field(field).to_python(value)
+                        for field, value in zip(self.ordering, position)]
+        except (TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(reverse)
+
+    def encode_value(self, value):
+        # DjangoJSONEncoder cuts microseconds, a cursor needs the exact value.
+        if isinstance(value, dt.datetime):
+            return value.isoformat()
+        return DjangoJSONEncoder().default(value)
+
+    def encode_cursor(self, position, reverse):
+        encoded = base64.urlsafe_b64encode(json.dumps(
+            [int(reverse), position],
+            default=self.encode_value).encode('utf-8'))
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded.decode('ascii'))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.get_position(self.page[0]), True)
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.count is not None:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
+
+
+class OptionalKeysetPagination(PageNumberPagination):
+    """
+    Page number pagination which switches to `keyset_class` when the client
+    opts in with `?pagination=cursor` or follows a cursor link.
+    """
+    keyset_class = KeysetPagination
+    mode_query_param = 'pagination'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (request.query_params.get(self.mode_query_param) == 'cursor'
+                or self.keyset_class.cursor_query_param
+                in request.query_params):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class TitleKeysetPagination(KeysetPagination):
+    ordering = ('name', 'id')
+    # Search results are ordered by relevance.
+    ordering_query_params = ('q',)
+
+
+class TitlePagination(OptionalKeysetPagination):
+    keyset_class = TitleKeysetPagination
+
+
+class PubDateKeysetPagination(KeysetPagination):
+    ordering = ('pub_date', 'id')
+
+
+class PubDatePagination(OptionalKeysetPagination):
+    keyset_class = PubDateKeysetPagination
@@ -1,12 +1,16 @@
 import datetime as dt
+import json
 import re
 
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
 from rest_framework.exceptions import ValidationError
-from rest_framework.validators import UniqueValidator
+from rest_framework.settings import api_settings
 
-from reviews.models import Category, Genre, Title, Review, Comment, GenreTitle
-from users.models import User
+from .bulk import OPERATIONS, SET_ROLE
+from reviews.models import (
+    AuthorStats, Category, Genre, Title, Review, Comment, GenreTitle)
+from users.models import User, fold_case
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -21,12 +25,62 @@ class GenreSerializer(serializers.ModelSerializer):
         model = Genre
 
 
+class ManySlugRelatedField(serializers.ManyRelatedField):
+    """Resolves the whole list of slugs with a single IN query."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        slug_field = self.child_relation.slug_field
+        slugs = list(dict.fromkeys(str(slug) for slug in data))
+        found = {
+            getattr(obj, slug_field): obj
+            for obj in self.child_relation.get_queryset().filter(
+                **{f'{slug_field}__in': slugs})
+        }
+        for slug in slugs:
+            if slug not in found:
+                self.child_relation.fail(
+                    'does_not_exist', slug_name=slug_field, value=slug)
+        return [found[slug] for slug in slugs]
+
+
+class TitleListSerializer(serializers.ListSerializer):
+    """
+    Renders the flat rows of `TitleQuerySet.as_rows` in the shape of
+    `TitleSerializer` without model instances or nested serializers.
+    """
+
+    def to_representation(self, data):
+        rows = list(data)
+        if not rows or not isinstance(rows[0], dict):
+            return super().to_representation(rows)
+        return [
+            {
+                'id': row['id'],
+                'name': row['name'],
+                'year': row['year'],
+                'rating': row['rating'],
+                'description': row['description'],
+                'genre': json.loads(row['genres_json'] or '[]'),
+                'category': {
+                    'name': row['category__name'] or '',
+                    'slug': row['category__slug'] or '',
+                },
+            }
+            for row in rows
+        ]
+
+
 class TitleSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
-    genre = serializers.SlugRelatedField(
-        queryset=Genre.objects.all(),
-        slug_field='slug',
-        many=True
+    genre = ManySlugRelatedField(
+        child_relation=serializers.SlugRelatedField(
+            queryset=Genre.objects.all(),
+            slug_field='slug'
+        )
     )
 
     category = serializers.SlugRelatedField(
@@ -40,6 +94,7 @@ class TitleSerializer(serializers.ModelSerializer):
             'description', 'genre', 'category')
         model = Title
         read_only_fields = ('id', 'rating')
+        list_serializer_class = TitleListSerializer
 
     def to_representation(self, instance):
         """Give a response with all fields of genre and comment."""
@@ -51,14 +106,32 @@ class TitleSerializer(serializers.ModelSerializer):
         return response
 
     def create(self, validated_data):
-        genre_slugs = validated_data.pop('genre')
-        title = Title.objects.create(**validated_data)
-        for genre_slug in genre_slugs:
-            current_genre = Genre.objects.get(slug=genre_slug.slug)
-            GenreTitle.objects.create(
-                genre=current_genre, title=title)
+        genres = validated_data.pop('genre')
+        with transaction.atomic():
+            title = Title.objects.create(**validated_data)
+            GenreTitle.objects.bulk_create(
+                GenreTitle(genre=genre, title=title) for genre in genres)
         return title
 
+    def update(self, instance, validated_data):
+        genres = validated_data.pop('genre', None)
+        with transaction.atomic():
+            instance = super().update(instance, validated_data)
+            if genres is not None:
+                self.set_genres(instance, genres)
+        return instance
+
+    def set_genres(self, title, genres):
+        """Delete the removed genre links and insert only the new ones."""
+        links = GenreTitle.objects.filter(title=title)
+        current = set(links.values_list('genre_id', flat=True))
+        wanted = {genre.pk for genre in genres}
+        if current - wanted:
+            links.filter(genre_id__in=current - wanted).delete()
+        GenreTitle.objects.bulk_create(
+            GenreTitle(genre=genre, title=title)
+            for genre in genres if genre.pk not in current)
+
     def validate_year(self, value):
         year = dt.date.today().year
         if value > year:
@@ -67,27 +140,36 @@ class TitleSerializer(serializers.ModelSerializer):
         return value
 
 
+def validate_username_format(username):
+    if re.search(r'^[a-zA-Z][a-zA-Z0-9-_\.]{1,20}$', username) is None:
+        raise ValidationError(
+            "Name contains invalid characters.")
+    return username
+
+
 class RegistrySerializer(serializers.ModelSerializer):
-    """New user registration serialazer."""
-    username = serializers.CharField(
-        required=True,
-        validators=[UniqueValidator(queryset=User.objects.all()), ]
-    )
-    email = serializers.EmailField(
-        required=True,
-        validators=[UniqueValidator(queryset=User.objects.all()), ]
-    )
+    """
+    New user registration serialazer. Taken usernames and emails are
+    looked up in `matches` of the context, the users found by
+    `User.objects.signup_matches`, instead of a query per check.
+    """
+    username = serializers.CharField(required=True)
+    email = serializers.EmailField(required=True)
 
     class Meta:
         model = User
         fields = ('username', 'email')
 
+    def is_taken(self, field, value):
+        return any(fold_case(getattr(user, field)) == fold_case(value)
+                   for user in self.context['matches'])
+
     def validate_email(self, email):
         if email == '':
             raise serializers.ValidationError(
                 'Email not specified.'
             )
-        elif User.objects.filter(email__iexact=email).exists():
+        elif self.is_taken('email', email):
             raise serializers.ValidationError(
                 'Email already exists.'
             )
@@ -97,14 +179,22 @@ class RegistrySerializer(serializers.ModelSerializer):
         if username.lower() == 'me':
             raise ValidationError(
                 "Using 'me' name as username is prohibited.")
-        elif User.objects.filter(username__iexact=username).exists():
+        elif self.is_taken('username', username):
             raise serializers.ValidationError(
                 'User with this username already exists.'
             )
-        elif re.search(r'^[a-zA-Z][a-zA-Z0-9-_\.]{1,20}$', username) is None:
+        return validate_username_format(username)
+
+
+class UsernameCheckSerializer(serializers.Serializer):
+    """Username of a live availability check."""
+    username = serializers.CharField(required=True)
+
+    def validate_username(self, username):
+        if username.lower() == 'me':
             raise ValidationError(
-                "Name contains invalid characters.")
-        return username
+                "Using 'me' name as username is prohibited.")
+        return validate_username_format(username)
 
 
 class JWTTokenSerializer(serializers.Serializer):
@@ -128,16 +218,63 @@ class UserSerializer(serializers.ModelSerializer):
                   'first_name', 'last_name', 'bio')
 
     def validate_username(self, username):
-        user = User.objects.filter(username=username).exists()
-        if user:
+        if not username.isascii():
+            raise serializers.ValidationError(
+                "Name contains invalid characters.")
+        if User.objects.username_taken(username):
             raise serializers.ValidationError(
                 "User with this username already exists."
             )
         return username
 
+    def validate_email(self, email):
+        # Unique ignoring case, as the lower(email) index demands.
+        if User.objects.email_taken(
+                email, exclude_pk=getattr(self.instance, 'pk', None)):
+            raise serializers.ValidationError(
+                "User with this email already exists."
+            )
+        return email
+
+
+class UserBulkSerializer(serializers.Serializer):
+    """Usernames and the operation of a bulk user change."""
+    usernames = serializers.ListField(
+        child=serializers.CharField(max_length=100),
+        allow_empty=False,
+        max_length=1000
+    )
+    operation = serializers.ChoiceField(choices=OPERATIONS)
+    role = serializers.ChoiceField(choices=User.USER_ROLES, required=False)
+
+    def validate_usernames(self, usernames):
+        return list(dict.fromkeys(usernames))
+
+    def validate(self, data):
+        if data['operation'] == SET_ROLE and 'role' not in data:
+            raise serializers.ValidationError(
+                {'role': 'Role is required to set it.'})
+        return data
+
+
+class UserProfileSerializer(UserSerializer):
+    stats = serializers.SerializerMethodField()
 
-class UserMeChangeSerializer(UserSerializer):
     class Meta(UserSerializer.Meta):
+        fields = UserSerializer.Meta.fields + ('stats',)
+
+    def get_stats(self, user):
+        """Stored activity counters, zero for a user without any."""
+        stats = getattr(user, 'author_stats', None) or AuthorStats()
+        return {
+            'review_count': stats.review_count,
+            'comment_count': stats.comment_count,
+            'average_score': stats.average_score,
+        }
+
+
+class UserMeChangeSerializer(UserProfileSerializer):
+    class Meta(UserProfileSerializer.Meta):
         read_only_fields = ('username', 'email', 'role')
 
 
@@ -146,21 +283,56 @@ class ReviewSerializer(serializers.ModelSerializer):
         read_only=True, slug_field='username')
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = ('id', 'text', 'author', 'score', 'pub_date', 'comment_count')
         model = Review
         read_only_field = ('title',)
 
     def validate(self, attrs):
         if attrs['score'] < 1 or attrs['score'] > 10:
             raise serializers.ValidationError('Grade should be from 1 till 10!')
-        if (
-                Review.objects.filter(
-                    title__id=self.context['view'].kwargs['title_id'],
-                    author=self.context['request'].user).exists()
-                and self.context['request'].method == 'POST'):
-            raise serializers.ValidationError('You can write just one review!')
         return super().validate(attrs)
 
+    def create(self, validated_data):
+        # The unique constraint decides whether the author already has
+        # a review, which also holds for two concurrent requests.
+        try:
+            with transaction.atomic():
+                return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                    title=validated_data['title'],
+                    author=validated_data['author']).exists():
+                raise
+            raise serializers.ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'You can write just one review!']
+            })
+
+
+class AuthorReviewSerializer(ReviewSerializer):
+    """Review listed among the activity of its author."""
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title',)
+        read_only_fields = ('title',)
+
+
+class EmbeddedCommentSerializer(serializers.ModelSerializer):
+    """Comment inlined into a review, read by `latest_per_review`."""
+    author = serializers.CharField(source='author_username', read_only=True)
+
+    class Meta:
+        fields = ('id', 'text', 'author', 'pub_date')
+        model = Comment
+
+
+class ExpandedReviewSerializer(ReviewSerializer):
+    comments = EmbeddedCommentSerializer(
+        source='latest_comments', many=True, read_only=True)
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('comments',)
+
 
 class CommentSerialiser(serializers.ModelSerializer):
     author = serializers.SlugRelatedField(
@@ -170,3 +342,12 @@ class CommentSerialiser(serializers.ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
         model = Comment
         read_only_field = ('review',)
+
+
+class AuthorCommentSerializer(CommentSerialiser):
+    """Comment listed among the activity of its author."""
+    title = serializers.IntegerField(source='review.title_id', read_only=True)
+
+    class Meta(CommentSerialiser.Meta):
+        fields = CommentSerialiser.Meta.fields + ('review', 'title')
+        read_only_fields = ('review',)
@@ -0,0 +1,88 @@
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .cache import response_cache
+from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
+                            Title)
+from reviews.signals import rows_purged
+from users.bloom import signup_filter
+from users.models import User
+
+
+@receiver(post_save, sender=Title)
+@receiver(post_delete, sender=Title)
+def invalidate_title(sender, instance, **kwargs):
+    response_cache.invalidate(
+        'titles', f'title:{instance.pk}', f'reviews:{instance.pk}')
+
+
+@receiver(post_save, sender=GenreTitle)
+@receiver(post_delete, sender=GenreTitle)
+def invalidate_title_genres(sender, instance, **kwargs):
+    response_cache.invalidate('titles', f'title:{instance.title_id}')
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_review(sender, instance, **kwargs):
+    response_cache.invalidate(
+        f'title:{instance.title_id}', f'reviews:{instance.title_id}',
+        f'comments:{instance.pk}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment(sender, instance, **kwargs):
+    # The review list shows comment counts and the latest comments.
+    if Comment.review.is_cached(instance):
+        title_id = instance.review.title_id
+    else:
+        title_id = (Review.objects.filter(pk=instance.review_id)
+                    .values_list('title_id', flat=True).first())
+    response_cache.invalidate(
+        f'comments:{instance.review_id}', f'reviews:{title_id}')
+
+
+@receiver(rows_purged)
+def invalidate_purged(sender, reviews, **kwargs):
+    tags = {f'comments:{review_id}' for review_id in reviews}
+    for title_id in set(reviews.values()):
+        tags.add(f'reviews:{title_id}')
+        if sender is Review:
+            tags.add(f'title:{title_id}')
+    response_cache.invalidate(*tags)
+
+
+@receiver(post_init, sender=Category)
+@receiver(post_init, sender=Genre)
+def remember_slug(sender, instance, **kwargs):
+    instance._stored_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category(sender, instance, **kwargs):
+    response_cache.invalidate(
+        'categories', f'category:{instance._stored_slug}',
+        f'category:{instance.slug}')
+    instance._stored_slug = instance.slug
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+def invalidate_genre(sender, instance, **kwargs):
+    response_cache.invalidate(
+        'genres', f'genre:{instance._stored_slug}', f'genre:{instance.slug}')
+    instance._stored_slug = instance.slug
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_user(sender, instance, **kwargs):
+    user_cache.delete(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def remember_signup_names(sender, instance, **kwargs):
+    signup_filter.add(instance.username, instance.email)
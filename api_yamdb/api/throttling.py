@@ -0,0 +1,175 @@
+import sqlite3
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class ThrottleStore:
+    """
+    Token buckets of all worker processes in a local SQLite file, its path
+    is read from `settings.THROTTLE_STORE`. A check refills and takes a
+    token of its bucket in one statement, so the processes share the
+    counters without a server to ask.
+    """
+
+    def __init__(self):
+        self.local = threading.local()
+
+    @property
+    def path(self):
+        return getattr(settings, 'THROTTLE_STORE', {}).get(
+            'PATH', 'throttle.sqlite3')
+
+    @property
+    def connection(self):
+        connection = getattr(self.local, 'connection', None)
+        if connection is None or self.local.path != self.path:
+            if connection is not None:
+                connection.close()
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None,
+                check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS throttle_bucket ('
+                'key TEXT PRIMARY KEY, scope TEXT NOT NULL, '
+                'capacity REAL NOT NULL, rate REAL NOT NULL, '
+                'tokens REAL NOT NULL, allowed INTEGER NOT NULL, '
+                'updated REAL NOT NULL) WITHOUT ROWID')
+            self.local.connection = connection
+            self.local.path = self.path
+        return connection
+
+    def hit(self, key, scope, capacity, rate):
+        """
+        Take a token from the bucket of the key, refilled at `rate` tokens
+        a second up to `capacity`. Returns whether there was one and the
+        tokens left.
+        """
+        refilled = 'min(:capacity, tokens + (:now - updated) * :rate)'
+        return self.connection.execute(
+            'INSERT INTO throttle_bucket VALUES '
+            '(:key, :scope, :capacity, :rate, :capacity - 1, 1, :now) '
+            'ON CONFLICT (key) DO UPDATE SET '
+            'capacity = :capacity, rate = :rate, '
+            f'allowed = {refilled} >= 1, '
+            f'tokens = {refilled} - ({refilled} >= 1), '
+            'updated = :now '
+            'RETURNING allowed, tokens',
+            {'key': key, 'scope': scope, 'capacity': capacity,
+             'rate': rate, 'now': time.time()}
+        ).fetchone()
+
+    def state(self, scope=None):
+        """
+        Buckets still short of tokens, the full ones are dropped: they
+        would start over the same way.
+        """
+        now = time.time()
+        self.connection.execute(
+            'DELETE FROM throttle_bucket '
+            'WHERE tokens + (? - updated) * rate >= capacity', (now,))
+        rows = self.connection.execute(
+            'SELECT key, scope, capacity, rate, tokens, updated '
+            'FROM throttle_bucket WHERE ? IS NULL OR scope = ? '
+            'ORDER BY scope, key', (scope, scope))
+        state = []
+        for key, scope, capacity, rate, tokens, updated in rows:
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            state.append({
+                'key': key,
+                'scope': scope,
+                'capacity': int(capacity),
+                'tokens': round(tokens, 2),
+                'wait': round(max(1 - tokens, 0) / rate, 2),
+            })
+        return state
+
+
+throttle_store = ThrottleStore()
+
+
+class BucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket throttle over `throttle_store`. A rate of 'n/period' from
+    `DEFAULT_THROTTLE_RATES` holds n tokens refilled over the period; a
+    scope without a rate is not throttled.
+    """
+
+    def __init__(self):
+        # The rate is looked up per request, the scope may depend on it.
+        pass
+
+    def get_scope(self, request):
+        return self.scope
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(request)
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if self.scope is None or rate is None:
+            return True
+        self.num_requests, self.duration = self.parse_rate(rate)
+        key = self.get_cache_key(request, view)
+        if key is None:
+            return True
+        allowed, self.tokens = throttle_store.hit(
+            key, self.scope, self.num_requests,
+            self.num_requests / self.duration)
+        return bool(allowed)
+
+    def wait(self):
+        return (1 - self.tokens) * self.duration / self.num_requests
+
+
+class IPThrottle(BucketThrottle):
+    """Counts the requests of a client address."""
+
+    def get_cache_key(self, request, view):
+        return f'{self.scope}:{self.get_ident(request)}'
+
+
+class UsernameThrottle(BucketThrottle):
+    """Counts the requests naming a username, whatever the address."""
+
+    def get_cache_key(self, request, view):
+        username = str(request.data.get('username') or '').strip().lower()
+        if not username:
+            return None
+        return f'{self.scope}:{username}'
+
+
+class RoleThrottle(BucketThrottle):
+    """
+    Counts the writes of an authenticated user under the rate of the role,
+    `write_user`, `write_moderator` or `write_admin`.
+    """
+    methods = ('POST', 'PUT')
+
+    def get_scope(self, request):
+        if request.user.is_authenticated:
+            return f'write_{request.user.role}'
+        return None
+
+    def get_cache_key(self, request, view):
+        if request.method not in self.methods:
+            return None
+        return f'{self.scope}:{request.user.pk}'
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignupUsernameThrottle(UsernameThrottle):
+    scope = 'signup_username'
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(UsernameThrottle):
+    scope = 'token_username'
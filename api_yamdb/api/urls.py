@@ -3,8 +3,8 @@ from rest_framework.routers import DefaultRouter
 
 from .views import (
     TitleViewSet, CategoryViewSet, GenreViewSet, RegistryView,
-    JWTTokenView, UserViewSet, ReviewViewSet,
-    CommentViewSet)
+    JWTTokenView, CheckUsernameView, AuthCacheStatsView, ThrottleStateView,
+    UserViewSet, ReviewViewSet, CommentViewSet)
 
 app_name = 'api'
 
@@ -23,5 +23,10 @@ router_v1.register(
 urlpatterns = [
     path('v1/auth/signup/', RegistryView),
     path('v1/auth/token/', JWTTokenView),
+    path('v1/auth/check-username/', CheckUsernameView),
+    path('v1/auth/cache-stats/', AuthCacheStatsView),
+    path('v1/auth/throttles/', ThrottleStateView),
+    path('v1/titles/<int:pk>/export.ndjson',
+         TitleViewSet.as_view({'get': 'export'}), name='title-export'),
     path('v1/', include(router_v1.urls))
 ]
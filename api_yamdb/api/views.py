@@ -1,25 +1,44 @@
-from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, status, mixins
-from rest_framework.decorators import action, api_view
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.pagination import PageNumberPagination
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import AccessToken
 
+from .authentication import token_cache, user_cache
+from .bulk import bulk_update_users
+from .cache import (CachedObjectMixin, CachedResponseMixin,
+                    ConditionalGetMixin)
+from .export import export_title
 from .filters import TitleFilter
+from .pagination import (PubDateKeysetPagination, PubDatePagination,
+                         TitlePagination)
 from .permissions import IsAdmin, IsAdminOrReadOnly, IsAdminModeratorAuthor
 from .serializers import (
     CategorySerializer, GenreSerializer, TitleSerializer, RegistrySerializer,
-    JWTTokenSerializer, UserSerializer, UserMeChangeSerializer,
-    ReviewSerializer, CommentSerialiser)
-from api_yamdb import settings
-from reviews.models import Category, Genre, Title, Review, Comment
-from users.models import User
+    JWTTokenSerializer, UserSerializer, UserBulkSerializer,
+    UserProfileSerializer, UserMeChangeSerializer, UsernameCheckSerializer,
+    ReviewSerializer, CommentSerialiser, ExpandedReviewSerializer,
+    AuthorReviewSerializer, AuthorCommentSerializer)
+from .throttling import (RoleThrottle, SignupIPThrottle,
+                         SignupUsernameThrottle, TokenIPThrottle,
+                         TokenUsernameThrottle, throttle_store)
+from reviews.deletion import schedule_deletion
+from reviews.models import (
+    SCORES, Category, Genre, LeaderboardEntry, Title, Review, Comment)
+from users.bloom import signup_filter
+from users.models import ConfirmationCode, User
+from users.outbox import queue_email
 
 
 class CreateListDestroyViewSet(
@@ -31,22 +50,148 @@ class CreateListDestroyViewSet(
     pass
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class ParentScopedMixin:
+    """
+    Lists the objects of the parent from the URL without loading the parent
+    first: its existence is only checked when the page turns out empty.
+    """
+    parent_model = None
+    parent_lookup_kwarg = None
+
+    def get_parent_queryset(self):
+        """The parents the listed objects may belong to."""
+        return self.parent_model.objects.all()
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page and not self.get_parent_queryset().filter(
+                pk=self.kwargs[self.parent_lookup_kwarg]).exists():
+            raise Http404
+        return page
+
+
+class AsyncDestroyMixin:
+    """
+    With the ASYNC_DELETION setting on, `destroy` only hides the object and
+    answers 202 Accepted; the `purge_deleted` command removes it together
+    with its dependents later, in bounded chunks.
+    """
+
+    def destroy(self, request, *args, **kwargs):
+        if not getattr(settings, 'ASYNC_DELETION', False):
+            return super().destroy(request, *args, **kwargs)
+        schedule_deletion(self.get_object())
+        return Response(status=status.HTTP_202_ACCEPTED)
+
+
+class TitleViewSet(ConditionalGetMixin, CachedObjectMixin, AsyncDestroyMixin,
+                   viewsets.ModelViewSet):
     """To create, edit, delete, etc. the title data."""
     queryset = (Title.objects.all()
                 .select_related('category')
                 .prefetch_related('genre')
-                .annotate(
-        rating=Avg('reviews__score')
-    ).order_by('name'))
+                .order_by('name', 'id'))
     serializer_class = TitleSerializer
-    pagination_class = PageNumberPagination
+    pagination_class = TitlePagination
     permission_classes = (IsAdminOrReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
+    cache_tags = ('titles',)
+
+    def get_queryset(self):
+        if self.action == 'list':
+            return self.queryset.as_rows()
+        return super().get_queryset()
+
+    def filter_queryset(self, queryset):
+        self.filtered_queryset = super().filter_queryset(queryset)
+        return self.filtered_queryset
+
+    def get_paginated_response(self, data):
+        """Add genre, category and decade counts when `?facets=true`."""
+        response = super().get_paginated_response(data)
+        if self.request.query_params.get('facets') in ('true', 'True', '1'):
+            response.data['facets'] = self.filtered_queryset.facets()
+        return response
 
+    def get_object_tags(self, item):
+        tags = [f'title:{item["id"]}']
+        if item['category']:
+            tags.append(f'category:{item["category"]["slug"]}')
+        tags.extend(f'genre:{genre["slug"]}' for genre in item['genre'])
+        return tags
 
-class CategoryViewSet(CreateListDestroyViewSet):
+    @action(
+        detail=True,
+        methods=['GET'],
+        url_path='rating-distribution',
+        url_name='rating_distribution'
+    )
+    def rating_distribution(self, request, pk=None):
+        """Number of reviews with each score, read from the stored counters."""
+        title = get_object_or_404(
+            Title.objects.only(*(f'score_{score}' for score in SCORES)),
+            pk=pk)
+        distribution = title.score_distribution
+        count = sum(distribution.values())
+        total = sum(score * amount for score, amount in distribution.items())
+        return Response({
+            'count': count,
+            'rating': total // count if count else None,
+            'scores': {str(score): amount
+                       for score, amount in distribution.items()},
+        })
+
+    @action(detail=False, methods=['GET'])
+    def top(self, request):
+        """Best rated titles, overall or of a `?genre=` or `?category=`."""
+        return self.leaderboard(request, LeaderboardEntry.TOP)
+
+    @action(detail=False, methods=['GET'])
+    def trending(self, request):
+        """Titles with the most recent reviews."""
+        return self.leaderboard(request, LeaderboardEntry.TRENDING)
+
+    def leaderboard(self, request, board):
+        scope = ''
+        for name in ('genre', 'category'):
+            if request.query_params.get(name):
+                scope = f'{name}:{request.query_params[name]}'
+        rows = (Title.objects
+                .filter(leaderboard_entries__board=board,
+                        leaderboard_entries__scope=scope)
+                .order_by('leaderboard_entries__position')
+                .as_rows())
+        serializer = self.get_serializer(rows, many=True)
+        return Response(serializer.data)
+
+    def export(self, request, pk=None):
+        """Stream the reviews and comments of the title as NDJSON."""
+        title = get_object_or_404(
+            Title.objects.only('name', 'year'), pk=pk)
+        response = StreamingHttpResponse(
+            export_title(title), content_type='application/x-ndjson')
+        response['Content-Disposition'] = (
+            f'attachment; filename="title-{title.pk}.ndjson"')
+        return response
+
+    def get_etag_tags(self):
+        if self.action != 'retrieve':
+            return ()
+        # The title embeds its category and genres, which change without
+        # a Title signal: renames, or a deleted category set to NULL.
+        tags = {f'title:{self.kwargs["pk"]}'}
+        for category, genre in Title.objects.filter(
+                pk=self.kwargs['pk']).values_list('category__slug',
+                                                  'genre__slug'):
+            if category:
+                tags.add(f'category:{category}')
+            if genre:
+                tags.add(f'genre:{genre}')
+        return sorted(tags)
+
+
+class CategoryViewSet(CachedResponseMixin, CreateListDestroyViewSet):
     """Create, show, delete category data."""
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
@@ -55,9 +200,10 @@ class CategoryViewSet(CreateListDestroyViewSet):
     search_fields = ('name',)
     permission_classes = (IsAdminOrReadOnly,)
     lookup_field = 'slug'
+    cache_tags = ('categories',)
 
 
-class GenreViewSet(CreateListDestroyViewSet):
+class GenreViewSet(CachedResponseMixin, CreateListDestroyViewSet):
     """Create, show, delete genre data."""
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
@@ -66,53 +212,158 @@ class GenreViewSet(CreateListDestroyViewSet):
     filter_backends = (SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    cache_tags = ('genres',)
+
+
+def _repeated_signup(matches, username, email):
+    """The live user of `matches` with exactly the username and email."""
+    return next((user for user in matches
+                 if user.username == username and user.email == email
+                 and user.deleted_at is None), None)
 
 
 @api_view(["POST"])
+@throttle_classes([SignupIPThrottle, SignupUsernameThrottle])
 def RegistryView(request):
     """Registrate a new user and send a confirmation code to email."""
-    try:
-        user = User.objects.get(username=request.data.get('username'),
-                                email=request.data.get('email'))
-    except User.DoesNotExist:
-        serializer = RegistrySerializer(data=request.data)
+    username = str(request.data.get('username') or '').strip()
+    email = str(request.data.get('email') or '').strip()
+    # One query finds the user signing up again as well as the users
+    # already holding the username or the email. It is skipped when the
+    # signup filter has seen neither of them, the unique indexes catch
+    # the users the filter has missed.
+    matches = []
+    if (signup_filter.might_exist(username)
+            or signup_filter.might_exist(email)):
+        matches = User.objects.signup_matches(username, email)
+    user = _repeated_signup(matches, username, email)
+    if user is None:
+        serializer = RegistrySerializer(data=request.data,
+                                        context={'matches': matches})
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
-        confirmation_code = default_token_generator.make_token(user)
-        user.confirmation_code = confirmation_code
-        user.save()
-        _send_email(serializer.validated_data.get("email"), confirmation_code)
-        return Response(serializer.validated_data, status=status.HTTP_200_OK)
-
-    confirmation_code = user.confirmation_code
-    _send_email(request.data['email'], confirmation_code)
+        try:
+            # The user and the email in the outbox are committed together.
+            with transaction.atomic():
+                user = serializer.save()
+                confirmation_code = ConfirmationCode.objects.issue(user.pk)
+                _send_email(serializer.validated_data.get("email"),
+                            confirmation_code)
+        except IntegrityError:
+            # A user unknown to the filter or saved by a concurrent
+            # signup holds the username or the email.
+            matches = User.objects.signup_matches(username, email)
+            user = _repeated_signup(matches, username, email)
+            if user is None:
+                RegistrySerializer(
+                    data=request.data, context={'matches': matches}
+                ).is_valid(raise_exception=True)
+                raise ValidationError(
+                    'User with this username or email already exists.')
+        else:
+            return Response(serializer.validated_data,
+                            status=status.HTTP_200_OK)
+
+    # A repeated signup gets a fresh code, the old one stops working.
+    with transaction.atomic():
+        confirmation_code = ConfirmationCode.objects.issue(user.pk)
+        _send_email(user.email, confirmation_code)
     return Response("Confirmation code has sent!", status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
+@throttle_classes([TokenIPThrottle, TokenUsernameThrottle])
 def JWTTokenView(request):
     """Sending a token for a verified username and verification code."""
     serializer = JWTTokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     username = serializer.validated_data.get('username')
-    user = get_object_or_404(User, username=username)
-    confirmation_code = serializer.validated_data.get('confirmation_code')
-    if confirmation_code == user.confirmation_code:
-        token = str(AccessToken.for_user(user))
+    user_id = ConfirmationCode.objects.verify(
+        username, serializer.validated_data.get('confirmation_code'))
+    if user_id is not None:
+        token = str(AccessToken.for_user(User(pk=user_id)))
         return Response({'token': token},
                         status=status.HTTP_201_CREATED)
+    get_object_or_404(User, username=username, deleted_at__isnull=True)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(viewsets.ModelViewSet):
+@api_view(["GET"])
+def CheckUsernameView(request):
+    """Tell whether a username is still free to sign up with."""
+    serializer = UsernameCheckSerializer(data=request.query_params)
+    serializer.is_valid(raise_exception=True)
+    username = serializer.validated_data['username']
+    # Not short-circuited by the signup filter: it can miss users saved
+    # by other workers since its last build.
+    available = not User.objects.username_taken(username)
+    return Response({'username': username, 'available': available})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def AuthCacheStatsView(request):
+    """Hits of the authentication caches of the serving process."""
+    return Response({'tokens': token_cache.stats(),
+                     'users': user_cache.stats()})
+
+
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def ThrottleStateView(request):
+    """Throttle buckets short of tokens, optionally of one scope."""
+    return Response(throttle_store.state(request.query_params.get('scope')))
+
+
+class UserViewSet(AsyncDestroyMixin, viewsets.ModelViewSet):
     """Gives access create, get and change users data."""
-    queryset = User.objects.all()
+    queryset = User.objects.filter(deleted_at__isnull=True)
     serializer_class = UserSerializer
     permission_classes = (IsAdmin,)
     filter_backends = (SearchFilter,)
     search_fields = ('username',)
     lookup_field = 'username'
 
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return UserProfileSerializer
+        return super().get_serializer_class()
+
+    @action(detail=True, methods=['GET'], permission_classes=(AllowAny,))
+    def reviews(self, request, username=None):
+        """Reviews written by the user, in order of publication."""
+        return self.activity(
+            Review.objects.filter(author=self.get_object(),
+                                  title__deleted_at__isnull=True)
+            .select_related('author'),
+            AuthorReviewSerializer)
+
+    @action(detail=True, methods=['GET'], permission_classes=(AllowAny,))
+    def comments(self, request, username=None):
+        """Comments written by the user, in order of publication."""
+        return self.activity(
+            Comment.objects.filter(author=self.get_object(),
+                                   review__title__deleted_at__isnull=True)
+            .select_related('author', 'review'),
+            AuthorCommentSerializer)
+
+    def activity(self, queryset, serializer_class):
+        # Every page is a range scan of an (author, pub_date, id) index.
+        paginator = PubDateKeysetPagination()
+        page = paginator.paginate_queryset(queryset, self.request, view=self)
+        serializer = serializer_class(
+            page, many=True, context=self.get_serializer_context())
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['POST'])
+    def bulk(self, request):
+        """Set the role of, deactivate or delete many users at once."""
+        serializer = UserBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        results, invalidated = bulk_update_users(
+            acting_user=request.user, **serializer.validated_data)
+        return Response({'results': results, 'invalidated': invalidated},
+                        status=status.HTTP_200_OK)
+
     @action(
         detail=False,
         methods=['GET', 'PATCH'],
@@ -137,37 +388,111 @@ class UserViewSet(viewsets.ModelViewSet):
                             status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(ConditionalGetMixin, ParentScopedMixin,
+                    viewsets.ModelViewSet):
     """Create, show, delete reviews data."""
     serializer_class = ReviewSerializer
     permission_classes = (IsAdminModeratorAuthor,)
+    throttle_classes = (RoleThrottle,)
+    pagination_class = PubDatePagination
+    parent_model = Title
+    parent_lookup_kwarg = 'title_id'
+    default_comments_limit = 3
+    max_comments_limit = 20
+
+    def get_etag_tags(self):
+        return (f'reviews:{self.kwargs["title_id"]}',)
+
+    @property
+    def expand_comments(self):
+        """`?expand=comments` inlines the latest comments of every review."""
+        expand = self.request.query_params.get('expand', '')
+        return self.action == 'list' and 'comments' in expand.split(',')
+
+    def get_comments_limit(self):
+        value = self.request.query_params.get('comments_limit')
+        if value is None:
+            return self.default_comments_limit
+        if not value.isdigit() or not (
+                1 <= int(value) <= self.max_comments_limit):
+            raise ValidationError({'comments_limit': [
+                f'Should be from 1 till {self.max_comments_limit}!']})
+        return int(value)
+
+    def get_serializer_class(self):
+        if self.expand_comments:
+            return ExpandedReviewSerializer
+        return super().get_serializer_class()
+
+    def paginate_queryset(self, queryset):
+        if not self.expand_comments:
+            return super().paginate_queryset(queryset)
+        limit = self.get_comments_limit()
+        page = super().paginate_queryset(queryset)
+        latest = defaultdict(list)
+        for comment in Comment.objects.latest_per_review(
+                [review.pk for review in page], limit):
+            latest[comment.review_id].append(comment)
+        for review in page:
+            review.latest_comments = latest[review.pk]
+        return page
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs['title_id'])
-        return Review.objects.select_related('author').filter(title=title)
+        return (Review.objects.select_related('author')
+                .filter(title_id=self.kwargs['title_id'],
+                        title__deleted_at__isnull=True)
+                .order_by('pub_date', 'id'))
 
     def perform_create(self, serializer):
         title = get_object_or_404(Title, pk=self.kwargs['title_id'])
         serializer.save(title=title, author=self.request.user)
 
+    @action(detail=False, methods=['PUT'], url_path='mine')
+    def mine(self, request, title_id=None):
+        """Create or replace the review of the current user."""
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        title = get_object_or_404(Title.objects.only('id'), pk=title_id)
+        review, created = Review.objects.upsert(
+            title.pk, request.user, **serializer.validated_data)
+        return Response(
+            self.get_serializer(review).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK
+        )
+
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, ParentScopedMixin,
+                     viewsets.ModelViewSet):
     """Create, show, delete comments data."""
     serializer_class = CommentSerialiser
+    pagination_class = PubDatePagination
+    parent_model = Review
+    parent_lookup_kwarg = 'review_id'
 
     permission_classes = (IsAdminModeratorAuthor,)
+    throttle_classes = (RoleThrottle,)
+
+    def get_etag_tags(self):
+        return (f'comments:{self.kwargs["review_id"]}',)
+
+    def get_parent_queryset(self):
+        return Review.objects.filter(title__deleted_at__isnull=True)
 
     def get_queryset(self):
-        review = get_object_or_404(Review, pk=self.kwargs['review_id'])
-        return Comment.objects.select_related('author').filter(review=review)
+        return (Comment.objects.select_related('author')
+                .filter(review_id=self.kwargs['review_id'],
+                        review__title__deleted_at__isnull=True)
+                .order_by('pub_date', 'id'))
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs['review_id'])
+        review = get_object_or_404(
+            Review, pk=self.kwargs['review_id'],
+            title__deleted_at__isnull=True)
         serializer.save(review=review, author=self.request.user)
 
 
 def _send_email(email, confirmation_code):
-    send_mail(
+    queue_email(
         subject="Your code for access",
         message=confirmation_code,
         from_email=settings.CONTACT_EMAIL,
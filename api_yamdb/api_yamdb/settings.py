@@ -20,8 +20,8 @@ INSTALLED_APPS = [
     'django_filters',
     'rest_framework_simplejwt',
     'users',
-    'reviews',
-    'api',
+    'reviews.apps.ReviewsConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
@@ -62,6 +62,63 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # LocMemCache is private to one process, so cached responses, ETags and
+    # their invalidations are only correct with a single worker. Several
+    # workers have to share them: switch to
+    # django.core.cache.backends.filebased.FileBasedCache or to
+    # django.core.cache.backends.db.DatabaseCache (run `createcachetable`).
+    'api': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'api-responses',
+    },
+}
+
+# Delete titles and users in the background: the API hides them and
+# answers 202, `manage.py purge_deleted` removes them with their dependents.
+ASYNC_DELETION = False
+
+API_RESPONSE_CACHE = {
+    'ENABLED': True,
+    'CACHE': 'api',
+    'TIMEOUT': 300,
+}
+
+# Users of authenticated requests cached in every worker process, a change
+# made by another process shows up after TIMEOUT seconds at the latest.
+AUTH_USER_CACHE = {
+    'ENABLED': True,
+    'MAX_SIZE': 1000,
+    'TIMEOUT': 60,
+}
+
+# Verified access tokens cached in every worker process until they expire.
+AUTH_TOKEN_CACHE = {
+    'ENABLED': True,
+    'MAX_SIZE': 1000,
+}
+
+# Confirmation codes expire TTL seconds after they are sent, on their first
+# use or after MAX_ATTEMPTS wrong guesses; `manage.py purge_codes` deletes
+# such codes.
+CONFIRMATION_CODES = {
+    'TTL': 86400,
+    'MAX_ATTEMPTS': 5,
+}
+
+# Usernames and emails taken so far in a Bloom filter of every worker:
+# signups of new names skip the lookup of users holding them, the unique
+# indexes still reject the ones saved since the last (background) rebuild.
+SIGNUP_FILTER = {
+    'ENABLED': True,
+    'CAPACITY': 100000,
+    'ERROR_RATE': 0.01,
+    'REBUILD_INTERVAL': 3600,
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -99,9 +156,21 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 CONTACT_EMAIL = "initialD@gmail.com"
 
+# Emails are queued in the outbox and sent by `manage.py send_outbox --loop`.
+# SEND_ON_COMMIT sends them right after the commit of the request instead,
+# inside the request cycle; the tests turn it on, servers leave it off. A
+# failed email is retried after RETRY_DELAY seconds, doubled on every
+# attempt, up to MAX_ATTEMPTS times.
+EMAIL_OUTBOX = {
+    'SEND_ON_COMMIT': False,
+    'BATCH_SIZE': 100,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_DELAY': 60,
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny'
@@ -111,6 +180,24 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'django_filters.rest_framework.DjangoFilterBackend',
     ),
+    # Token buckets of api.throttling, a scope without a rate is free.
+    'DEFAULT_THROTTLE_RATES': {
+        'signup_ip': '20/hour',
+        'signup_username': '5/hour',
+        'token_ip': '60/hour',
+        'token_username': '10/hour',
+        'write_user': '60/hour',
+        'write_moderator': '300/hour',
+        'write_admin': None,
+    },
+    # Clients are told apart by REMOTE_ADDR. Behind reverse proxies set it
+    # to their number, X-Forwarded-For is trusted only that far.
+    'NUM_PROXIES': 0,
+}
+
+# SQLite file holding the throttle counters of all worker processes.
+THROTTLE_STORE = {
+    'PATH': os.path.join(BASE_DIR, 'throttle.sqlite3'),
 }
 
 SIMPLE_JWT = {
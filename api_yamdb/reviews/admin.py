@@ -4,7 +4,8 @@ from .models import Title, Genre, Category, Review, Comment
 
 
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'year', 'description', 'category',)
+    list_display = ('id', 'name', 'year', 'description', 'category',
+                    'rating', 'review_count',)
     search_fields = ('name',)
     list_filter = ('category', 'genre')
     empty_value_display = '-пусто-'
@@ -0,0 +1,138 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import (AuthorStats, Comment, GenreTitle, LeaderboardEntry,
+                     Review, Title)
+from .signals import rows_purged
+from users.models import User
+
+CHUNK_SIZE = 500
+
+
+def schedule_deletion(instance):
+    """
+    Hide a title or a user at once and leave the deletion of the object
+    and everything depending on it to `purge_deleted`.
+    """
+    instance.deleted_at = timezone.now()
+    update_fields = ['deleted_at']
+    if isinstance(instance, User):
+        # Tokens of an inactive user are refused right away.
+        instance.is_active = False
+        update_fields.append('is_active')
+    instance.save(update_fields=update_fields)
+
+
+def raw_delete(queryset, chunk_size):
+    """
+    Delete the rows of a `values_list` queryset starting with the primary
+    key a chunk at a time, without loading model instances or sending
+    signals. Every chunk is yielded inside its own transaction, so the
+    caller fixes the counters it affected in the same one.
+    """
+    while True:
+        with transaction.atomic(using=queryset.db):
+            rows = list(queryset[:chunk_size])
+            if not rows:
+                return
+            queryset.model.objects.filter(
+                pk__in=[row[0] for row in rows])._raw_delete(queryset.db)
+            yield rows
+
+
+def delete_comments(queryset, chunk_size, *, count_removed):
+    """
+    Delete the comments and take them out of the stats of their authors,
+    decreasing `comment_count` of their reviews when `count_removed`,
+    i.e. unless the reviews go as well.
+    """
+    queryset = queryset.order_by().values_list(
+        'id', 'review_id', 'review__title_id', 'author_id')
+    for rows in raw_delete(queryset, chunk_size):
+        reviews = {review_id: title_id for _, review_id, title_id, _ in rows}
+        authors = Counter(author_id for *_, author_id in rows)
+        for author_id, number in authors.items():
+            AuthorStats.objects.shift(author_id, comments=-number,
+                                      create_missing=False)
+        if count_removed:
+            counts = Counter(review_id for _, review_id, _, _ in rows)
+            Review.objects.filter(pk__in=counts).update(
+                comment_count=F('comment_count') - Case(
+                    *(When(pk=review_id, then=Value(number))
+                      for review_id, number in counts.items()),
+                    default=Value(0)))
+        rows_purged.send(sender=Comment, reviews=reviews)
+
+
+def delete_reviews(queryset, chunk_size, *, count_removed):
+    """
+    Delete the reviews with their comments and take them out of the stats
+    of their authors, and out of the aggregates of the titles when
+    `count_removed`.
+    """
+    queryset = queryset.order_by().values_list(
+        'id', 'title_id', 'score', 'author_id')
+    while True:
+        chunk = list(queryset[:chunk_size])
+        if not chunk:
+            return
+        delete_comments(
+            Comment.objects.filter(review_id__in=[row[0] for row in chunk]),
+            chunk_size, count_removed=False)
+        for rows in raw_delete(queryset.filter(
+                pk__in=[row[0] for row in chunk]), chunk_size):
+            authors = defaultdict(Counter)
+            for _, _, score, author_id in rows:
+                authors[author_id][score] += 1
+            for author_id, counts in authors.items():
+                AuthorStats.objects.shift(
+                    author_id, reviews=-sum(counts.values()),
+                    score_sum=-sum(score * number
+                                   for score, number in counts.items()),
+                    create_missing=False)
+            if count_removed:
+                scores = defaultdict(Counter)
+                for _, title_id, score, _ in rows:
+                    scores[title_id][score] += 1
+                for title_id, counts in scores.items():
+                    Title.all_objects.filter(
+                        pk=title_id).remove_scores(counts)
+            rows_purged.send(sender=Review, reviews={
+                review_id: title_id for review_id, title_id, *_ in rows})
+
+
+def purge_title(title, chunk_size=CHUNK_SIZE):
+    """Delete the title, its reviews and their comments in chunks."""
+    delete_reviews(Review.objects.filter(title_id=title.pk), chunk_size,
+                   count_removed=False)
+    with transaction.atomic():
+        for model in (GenreTitle, LeaderboardEntry):
+            model.objects.filter(
+                title_id=title.pk)._raw_delete(title._state.db)
+        title.delete()
+
+
+def purge_user(user, chunk_size=CHUNK_SIZE):
+    """
+    Delete the user with their comments and reviews in chunks, fixing the
+    comment counts of reviews and the rating aggregates of titles.
+    """
+    delete_comments(Comment.objects.filter(author_id=user.pk), chunk_size,
+                    count_removed=True)
+    delete_reviews(Review.objects.filter(author_id=user.pk), chunk_size,
+                   count_removed=True)
+    user.delete()
+
+
+def purge_deleted(chunk_size=CHUNK_SIZE):
+    """Purge every title and user waiting for deletion."""
+    titles = list(Title.all_objects.filter(deleted_at__isnull=False))
+    users = list(User.objects.filter(deleted_at__isnull=False))
+    for title in titles:
+        purge_title(title, chunk_size)
+    for user in users:
+        purge_user(user, chunk_size)
+    return len(titles), len(users)
@@ -0,0 +1,27 @@
+from django.db.models import Aggregate, F, Func, TextField, Value
+
+
+class JSONObject(Func):
+    """A JSON object built in SQL from pairs of keys and expressions."""
+    function = 'JSON_OBJECT'
+    output_field = TextField()
+
+    def __init__(self, **fields):
+        expressions = []
+        for key, value in fields.items():
+            expressions.extend((Value(key), F(value)))
+        super().__init__(*expressions)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection,
+                           function='JSON_BUILD_OBJECT', **extra_context)
+
+
+class JSONGroupArray(Aggregate):
+    """Collects the aggregated values into a JSON array."""
+    function = 'JSON_GROUP_ARRAY'
+    output_field = TextField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(compiler, connection,
+                           function='JSON_AGG', **extra_context)
@@ -36,7 +36,7 @@ class Command(BaseCommand):
         with open(f'{settings.BASE_DIR}/static/data/titles.csv'
                   ) as csvfile:
             reader = csv.DictReader(csvfile)
-            Title.objects.all().delete()
+            Title.all_objects.all().delete()
             for row in reader:
                 Title.objects.create(
                     id=row['id'],
@@ -66,7 +66,7 @@ class Command(BaseCommand):
                     title_id=row['title_id'],
                     text=row['text'],
                     author=User.objects.get(id=row['author']),
-                    score=row['score'],
+                    score=int(row['score']),
                     pub_date=row['pub_date'],
                 )
 
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from reviews.deletion import CHUNK_SIZE, purge_deleted
+
+
+class Command(BaseCommand):
+    """Deletes the titles and users hidden by the API in the background."""
+    help = 'Delete titles and users waiting for deletion with dependents.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                            help='Rows deleted by one statement.')
+
+    def handle(self, *args, **options):
+        titles, users = purge_deleted(options['chunk_size'])
+        return f'{titles} titles and {users} users were deleted.'
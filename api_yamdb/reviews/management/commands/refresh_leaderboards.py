@@ -0,0 +1,59 @@
+import datetime as dt
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, ExpressionWrapper, F, FloatField, Q
+from django.utils import timezone
+
+from reviews.models import Category, Genre, LeaderboardEntry, Title
+
+
+class Command(BaseCommand):
+    """Recalculates the top rated and trending leaderboards."""
+    help = 'Refresh the top rated and trending title leaderboards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size', type=int, default=100,
+                            help='Titles kept in every leaderboard.')
+        parser.add_argument('--min-reviews', type=int, default=1,
+                            help='Reviews a title needs to be top rated.')
+        parser.add_argument('--days', type=int, default=7,
+                            help='Days of reviews counted for trending.')
+
+    def handle(self, *args, **options):
+        self.size = options['size']
+        since = timezone.now() - dt.timedelta(days=options['days'])
+        top = (Title.objects.filter(review_count__gte=options['min_reviews'])
+               .annotate(board_score=ExpressionWrapper(
+                   F('score_sum') * 1.0 / F('review_count'),
+                   output_field=FloatField()))
+               .order_by('-board_score', '-review_count', 'id'))
+        trending = (Title.objects
+                    .annotate(board_score=Count(
+                        'reviews', filter=Q(reviews__pub_date__gte=since)))
+                    .filter(board_score__gt=0)
+                    .order_by('-board_score', '-rating', 'id'))
+
+        entries = []
+        for board, titles in ((LeaderboardEntry.TOP, top),
+                              (LeaderboardEntry.TRENDING, trending)):
+            entries += self.rank(board, '', titles)
+            for slug in Genre.objects.values_list('slug', flat=True):
+                entries += self.rank(
+                    board, f'genre:{slug}', titles.filter(genre__slug=slug))
+            for slug in Category.objects.values_list('slug', flat=True):
+                entries += self.rank(board, f'category:{slug}',
+                                     titles.filter(category__slug=slug))
+
+        with transaction.atomic():
+            LeaderboardEntry.objects.all().delete()
+            LeaderboardEntry.objects.bulk_create(entries, batch_size=500)
+        return f'{len(entries)} leaderboard entries were refreshed.'
+
+    def rank(self, board, scope, titles):
+        return [
+            LeaderboardEntry(board=board, scope=scope, position=position,
+                             title_id=title_id, score=score)
+            for position, (title_id, score) in enumerate(
+                titles.values_list('id', 'board_score')[:self.size], 1)
+        ]
@@ -0,0 +1,47 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:49
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def fill_ratings(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = (Review.objects.filter(title=OuterRef('pk'))
+               .order_by().values('title'))
+    Title.objects.update(
+        score_sum=Coalesce(Subquery(
+            reviews.annotate(total=Sum('score')).values('total')), 0),
+        review_count=Coalesce(Subquery(
+            reviews.annotate(total=Count('pk')).values('total')), 0),
+        rating=Subquery(
+            reviews.annotate(avg=Sum('score') / Count('pk')).values('avg'),
+            output_field=models.IntegerField())
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_auto_20230104_1000'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.IntegerField(editable=False, null=True, verbose_name='Average score'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='review_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Reviews count'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Sum of scores'),
+        ),
+        migrations.RunPython(fill_ratings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:52
+
+from django.db import migrations, models
+import django.db.models.deletion
+import reviews.search
+from reviews.search import CREATE_SEARCH_TABLE, SEARCH_TABLE
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(CREATE_SEARCH_TABLE)
+    schema_editor.execute(
+        f'INSERT INTO {SEARCH_TABLE} (rowid, name, description) '
+        "SELECT id, name, COALESCE(description, '') FROM reviews_title"
+    )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_title_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleSearchIndex',
+            fields=[
+                ('title', models.OneToOneField(db_column='rowid', on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='reviews.Title')),
+                ('name', models.TextField()),
+                ('description', models.TextField()),
+                ('document', reviews.search.FullTextField(db_column='reviews_title_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'reviews_title_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
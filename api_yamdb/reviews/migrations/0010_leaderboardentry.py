@@ -0,0 +1,32 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:59
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_score_distribution'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('top', 'top rated'), ('trending', 'trending')], max_length=20)),
+                ('scope', models.CharField(blank=True, help_text='Empty, genre:<slug> or category:<slug>', max_length=60)),
+                ('position', models.PositiveIntegerField()),
+                ('score', models.FloatField()),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='reviews.Title')),
+            ],
+            options={
+                'ordering': ('board', 'scope', 'position'),
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboardentry',
+            constraint=models.UniqueConstraint(fields=('board', 'scope', 'position'), name='unique_leaderboard_position'),
+        ),
+    ]
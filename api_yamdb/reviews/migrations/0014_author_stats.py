@@ -0,0 +1,53 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:11
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def fill_author_stats(apps, schema_editor):
+    AuthorStats = apps.get_model('reviews', 'AuthorStats')
+    Review = apps.get_model('reviews', 'Review')
+    Comment = apps.get_model('reviews', 'Comment')
+    stats = {}
+    for row in (Review.objects.order_by().values('author_id')
+                .annotate(review_count=Count('pk'), score_sum=Sum('score'))):
+        stats[row['author_id']] = AuthorStats(
+            user_id=row['author_id'], review_count=row['review_count'],
+            score_sum=row['score_sum'])
+    for row in (Comment.objects.order_by().values('author_id')
+                .annotate(comment_count=Count('pk'))):
+        stats.setdefault(
+            row['author_id'], AuthorStats(user_id=row['author_id'])
+        ).comment_count = row['comment_count']
+    AuthorStats.objects.bulk_create(stats.values(), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_user_deleted_at'),
+        ('reviews', '0013_title_deleted_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='author_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('review_count', models.PositiveIntegerField(default=0, verbose_name='Reviews count')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Comments count')),
+                ('score_sum', models.PositiveIntegerField(default=0, verbose_name='Sum of scores')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['author', 'pub_date', 'id'], name='comment_author_pub_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['author', 'pub_date', 'id'], name='review_author_pub_date_idx'),
+        ),
+        migrations.RunPython(fill_author_stats, migrations.RunPython.noop),
+    ]
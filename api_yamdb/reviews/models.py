@@ -1,8 +1,16 @@
-from django.db import models
-from django.db.models import TextField
+from django.db import connections, models, transaction
+from django.db.models import (Case, CharField, Count, F, IntegerField,
+                              OuterRef, Subquery, Sum, TextField, Value, When)
+from django.db.models.functions import Cast
+from django.db.models.signals import post_save
+from django.utils import timezone
 
+from .functions import JSONGroupArray, JSONObject
+from .search import SEARCH_TABLE, FullTextField
 from users.models import User
 
+SCORES = range(1, 11)
+
 
 class Category(models.Model):
     """Create and saves category data."""
@@ -26,7 +34,123 @@ class Genre(models.Model):
         return self.name
 
 
-class Title(models.Model):
+class CounterFieldsMixin:
+    """
+    Leaves the `counter_fields`, maintained by UPDATE statements with F()
+    expressions, out of the UPDATE of a regular save, so an edit made from
+    a stale instance does not overwrite them.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if (not self._state.adding and self.counter_fields
+                and kwargs.get('update_fields') is None):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, **kwargs)
+
+
+class VisibleManager(models.Manager):
+    """Leaves out the rows waiting for a background deletion."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
+
+class TitleQuerySet(models.QuerySet):
+    """Keeps the stored rating aggregates of titles up to date."""
+
+    def shift_scores(self, added=None, removed=None):
+        """
+        Apply one review score change to the stored aggregates in a single
+        UPDATE: `added` is the new score, `removed` the replaced one.
+        """
+        score_delta = (added or 0) - (removed or 0)
+        count_delta = (added is not None) - (removed is not None)
+        if not score_delta and not count_delta:
+            return 0
+        histogram = {}
+        if removed in SCORES:
+            histogram[removed] = -1
+        if added in SCORES:
+            histogram[added] = histogram.get(added, 0) + 1
+        return self._shift(histogram, score_delta, count_delta)
+
+    def remove_scores(self, counts):
+        """
+        Take many reviews out of the stored aggregates in a single UPDATE:
+        `counts` maps a score to the number of removed reviews with it.
+        """
+        if not counts:
+            return 0
+        return self._shift(
+            {score: -number for score, number in counts.items()},
+            -sum(score * number for score, number in counts.items()),
+            -sum(counts.values()))
+
+    def _shift(self, histogram, score_delta, count_delta):
+        # Every expression of an UPDATE sees the row as it was before it,
+        # so the new rating is calculated from the shifted values.
+        return self.update(
+            **{f'score_{score}': F(f'score_{score}') + delta
+               for score, delta in histogram.items() if delta},
+            score_sum=F('score_sum') + score_delta,
+            review_count=F('review_count') + count_delta,
+            rating=Case(
+                When(review_count=-count_delta, then=Value(None)),
+                default=((F('score_sum') + score_delta)
+                         / (F('review_count') + count_delta)),
+                output_field=IntegerField()
+            )
+        )
+
+    def as_rows(self):
+        """
+        Flat dicts with the category columns and the genres aggregated into
+        one JSON array per title, fetched without a prefetch query.
+        """
+        genres = (GenreTitle.objects.filter(title=OuterRef('pk'))
+                  .order_by().values('title')
+                  .annotate(genres=JSONGroupArray(
+                      JSONObject(name='genre__name', slug='genre__slug')))
+                  .values('genres'))
+        return (self.prefetch_related(None)
+                .annotate(genres_json=Subquery(genres))
+                .values('id', 'name', 'year', 'rating', 'description',
+                        'category__name', 'category__slug', 'genres_json'))
+
+    def facets(self):
+        """
+        Number of titles of the queryset in each genre, category and decade,
+        counted by one UNION ALL query.
+        """
+        ids = self.order_by().values('id')
+        titles = Title.objects.filter(id__in=ids).order_by()
+        genres = (GenreTitle.objects.filter(title_id__in=ids).order_by()
+                  .values(facet=Value('genre', output_field=CharField()),
+                          key=Cast('genre__slug', CharField()))
+                  .annotate(total=Count('title_id')))
+        categories = (titles.exclude(category=None)
+                      .values(facet=Value('category',
+                                          output_field=CharField()),
+                              key=Cast('category__slug', CharField()))
+                      .annotate(total=Count('id')))
+        decades = (titles
+                   .values(facet=Value('decade', output_field=CharField()),
+                           key=Cast(F('year') / 10 * 10, CharField()))
+                   .annotate(total=Count('id')))
+        result = {'genre': {}, 'category': {}, 'decade': {}}
+        for facet, key, total in genres.union(
+                categories, decades, all=True).values_list(
+                    'facet', 'key', 'total'):
+            result[facet][key] = total
+        return result
+
+
+class Title(CounterFieldsMixin, models.Model):
     """Create and saves title data."""
     name = models.CharField(max_length=256,
                             verbose_name='Titile name')
@@ -41,10 +165,66 @@ class Title(models.Model):
         on_delete=models.SET_NULL,
         related_name='titles'
     )
+    rating = models.IntegerField(null=True,
+                                 editable=False,
+                                 verbose_name='Average score')
+    review_count = models.PositiveIntegerField(default=0,
+                                               editable=False,
+                                               verbose_name='Reviews count')
+    score_sum = models.PositiveIntegerField(default=0,
+                                            editable=False,
+                                            verbose_name='Sum of scores')
+    # Number of reviews with each score, from one to ten.
+    score_1 = models.PositiveIntegerField(default=0, editable=False)
+    score_2 = models.PositiveIntegerField(default=0, editable=False)
+    score_3 = models.PositiveIntegerField(default=0, editable=False)
+    score_4 = models.PositiveIntegerField(default=0, editable=False)
+    score_5 = models.PositiveIntegerField(default=0, editable=False)
+    score_6 = models.PositiveIntegerField(default=0, editable=False)
+    score_7 = models.PositiveIntegerField(default=0, editable=False)
+    score_8 = models.PositiveIntegerField(default=0, editable=False)
+    score_9 = models.PositiveIntegerField(default=0, editable=False)
+    score_10 = models.PositiveIntegerField(default=0, editable=False)
+
+    deleted_at = models.DateTimeField(null=True,
+                                      editable=False,
+                                      db_index=True,
+                                      verbose_name='Deletion requested')
+
+    objects = VisibleManager.from_queryset(TitleQuerySet)()
+    all_objects = TitleQuerySet.as_manager()
+
+    counter_fields = ('rating', 'review_count', 'score_sum',
+                      *(f'score_{score}' for score in SCORES))
+
+    class Meta:
+        indexes = [models.Index(fields=['name', 'id'],
+                                name='title_name_id_idx')]
 
     def __str__(self):
         return self.name
 
+    @property
+    def score_distribution(self):
+        return {score: getattr(self, f'score_{score}') for score in SCORES}
+
+
+class TitleSearchIndex(models.Model):
+    """Full-text index of title names and descriptions, an FTS5 table."""
+    title = models.OneToOneField(Title,
+                                 primary_key=True,
+                                 db_column='rowid',
+                                 on_delete=models.DO_NOTHING,
+                                 related_name='search_index')
+    name = models.TextField()
+    description = models.TextField()
+    document = FullTextField(db_column=SEARCH_TABLE)
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = SEARCH_TABLE
+
 
 class GenreTitle(models.Model):
     """Bound model for reviews and genres."""
@@ -52,7 +232,51 @@ class GenreTitle(models.Model):
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
 
 
-class Review(models.Model):
+class ReviewQuerySet(models.QuerySet):
+
+    def upsert(self, title_id, author, text, score):
+        """
+        Create or replace the review of the author with one
+        INSERT ... ON CONFLICT statement. post_save is sent with the score
+        of the replaced review, so the receivers update the aggregates as
+        for a regular save.
+
+        The previous score is read by an UPDATE of the row to itself in
+        the same transaction: being a write, it takes the write lock first
+        (the row lock elsewhere), so a concurrent upsert of the same
+        author waits and then sees this one's score.
+        """
+        table = self.model._meta.db_table
+        with transaction.atomic(using=self.db):
+            with connections[self.db].cursor() as cursor:
+                cursor.execute(
+                    f'UPDATE {table} SET score = score '
+                    'WHERE title_id = %s AND author_id = %s RETURNING score',
+                    [title_id, author.pk])
+                previous = cursor.fetchone()
+            review = next(iter(self.raw(
+                f'INSERT INTO {table} '
+                '(text, author_id, score, pub_date, title_id, comment_count) '
+                'VALUES (%s, %s, %s, %s, %s, 0) '
+                'ON CONFLICT (title_id, author_id) DO UPDATE '
+                'SET text = excluded.text, score = excluded.score '
+                'RETURNING *',
+                [text, author.pk, score,
+                 connections[self.db].ops.adapt_datetimefield_value(
+                     timezone.now()),
+                 title_id]
+            )))
+            review.author = author
+            created = previous is None
+            if not created:
+                review._stored_score = (title_id, previous[0])
+            post_save.send(sender=self.model, instance=review,
+                           created=created, update_fields=None, raw=False,
+                           using=self.db)
+        return review, created
+
+
+class Review(CounterFieldsMixin, models.Model):
     """Creates and saves reviews data."""
     text = models.TextField(verbose_name='Text of review')
     author = models.ForeignKey(User,
@@ -64,14 +288,58 @@ class Review(models.Model):
     title = models.ForeignKey(Title,
                               on_delete=models.CASCADE,
                               related_name='reviews')
+    comment_count = models.PositiveIntegerField(default=0,
+                                                editable=False,
+                                                verbose_name='Comments count')
+
+    objects = ReviewQuerySet.as_manager()
+
+    counter_fields = ('comment_count',)
 
     class Meta:
         constraints = [models.UniqueConstraint(fields=['title', 'author'],
                                                name='unique_user_make_review')]
+        indexes = [models.Index(fields=['title', 'pub_date', 'id'],
+                                name='review_title_pub_date_idx'),
+                   models.Index(fields=['author', 'pub_date', 'id'],
+                                name='review_author_pub_date_idx')]
 
     def __str__(self) -> TextField:
         return self.text[20:]
 
+    def save(self, *args, **kwargs):
+        # The post_save receiver shifts the title rating, keep both
+        # statements in one transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class CommentQuerySet(models.QuerySet):
+
+    def latest_per_review(self, review_ids, limit):
+        """
+        At most `limit` newest comments of each of the reviews, read by one
+        query that numbers the comments of every review with ROW_NUMBER().
+        The author's username comes along as `author_username`.
+        """
+        if not review_ids:
+            return []
+        comments = self.model._meta.db_table
+        users = User._meta.db_table
+        placeholders = ', '.join(['%s'] * len(review_ids))
+        return self.raw(
+            'SELECT * FROM ('
+            'SELECT c.id, c.text, c.author_id, c.review_id, c.pub_date, '
+            'u.username AS author_username, '
+            'ROW_NUMBER() OVER ('
+            'PARTITION BY c.review_id ORDER BY c.pub_date DESC, c.id DESC'
+            ') AS position '
+            f'FROM {comments} c INNER JOIN {users} u ON u.id = c.author_id '
+            f'WHERE c.review_id IN ({placeholders})'
+            ') ranked WHERE position <= %s ORDER BY review_id, position',
+            [*review_ids, limit]
+        )
+
 
 class Comment(models.Model):
     """Creates and saves comment data."""
@@ -84,5 +352,111 @@ class Comment(models.Model):
     review = models.ForeignKey(Review, on_delete=models.CASCADE,
                                related_name='comments')
 
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=['review', 'pub_date', 'id'],
+                                name='comment_review_pub_date_idx'),
+                   models.Index(fields=['author', 'pub_date', 'id'],
+                                name='comment_author_pub_date_idx')]
+
     def __str__(self) -> TextField:
         return self.text[20:]
+
+    def save(self, *args, **kwargs):
+        # The post_save receiver moves the comment count of the review.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class LeaderboardEntry(models.Model):
+    """
+    A precomputed place of a title in one of the leaderboards, filled in
+    by the `refresh_leaderboards` command.
+    """
+    TOP = 'top'
+    TRENDING = 'trending'
+
+    BOARDS = (
+        (TOP, 'top rated'),
+        (TRENDING, 'trending'),
+    )
+
+    board = models.CharField(max_length=20,
+                             choices=BOARDS)
+    scope = models.CharField(max_length=60,
+                             blank=True,
+                             help_text=('Empty, genre:<slug> '
+                                        'or category:<slug>'))
+    position = models.PositiveIntegerField()
+    title = models.ForeignKey(Title,
+                              on_delete=models.CASCADE,
+                              related_name='leaderboard_entries')
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ('board', 'scope', 'position')
+        constraints = [
+            models.UniqueConstraint(fields=['board', 'scope', 'position'],
+                                    name='unique_leaderboard_position')
+        ]
+
+    def __str__(self):
+        return f'{self.board} {self.scope} #{self.position}'
+
+
+class AuthorStatsQuerySet(models.QuerySet):
+
+    def shift(self, user_id, reviews=0, comments=0, score_sum=0,
+              create_missing=True):
+        """
+        Apply a change of the activity of the user in one UPDATE. Call it
+        after the change is written: a missing row is then created from
+        the stored reviews and comments. Removals pass `create_missing`
+        off, the row of a user being deleted must not come back.
+        """
+        if self.filter(user_id=user_id).update(
+                review_count=F('review_count') + reviews,
+                comment_count=F('comment_count') + comments,
+                score_sum=F('score_sum') + score_sum):
+            return
+        if create_missing:
+            self.recalculate(user_id)
+
+    def recalculate(self, user_id):
+        reviews = Review.objects.filter(author_id=user_id).aggregate(
+            review_count=Count('id'), score_sum=Sum('score'))
+        self.update_or_create(user_id=user_id, defaults={
+            'review_count': reviews['review_count'],
+            'score_sum': reviews['score_sum'] or 0,
+            'comment_count': Comment.objects.filter(
+                author_id=user_id).count(),
+        })
+
+
+class AuthorStats(models.Model):
+    """
+    Activity counters of a user, kept up to date by the receivers of review
+    and comment changes, so a profile does not aggregate on read.
+    """
+    user = models.OneToOneField(User,
+                                primary_key=True,
+                                on_delete=models.CASCADE,
+                                related_name='author_stats')
+    review_count = models.PositiveIntegerField(default=0,
+                                               verbose_name='Reviews count')
+    comment_count = models.PositiveIntegerField(default=0,
+                                                verbose_name='Comments count')
+    score_sum = models.PositiveIntegerField(default=0,
+                                            verbose_name='Sum of scores')
+
+    objects = AuthorStatsQuerySet.as_manager()
+
+    def __str__(self):
+        return f'{self.user_id}: {self.review_count} reviews'
+
+    @property
+    def average_score(self):
+        if not self.review_count:
+            return None
+        return round(self.score_sum / self.review_count, 1)
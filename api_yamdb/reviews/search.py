@@ -0,0 +1,72 @@
+import re
+
+from django.db import connections, models
+from django.db.models import Lookup, Q
+
+SEARCH_TABLE = 'reviews_title_fts'
+CREATE_SEARCH_TABLE = (
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} '
+    'USING fts5(name, description, tokenize="unicode61 remove_diacritics 2")'
+)
+WORD_PATTERN = re.compile(r'\w+')
+
+
+class FullTextField(models.TextField):
+    """The hidden FTS5 column named after the table, target of MATCH."""
+
+
+@FullTextField.register_lookup
+class Match(Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+def has_search_index(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """
+    Turn free user input into an FTS5 query: every word has to match
+    the beginning of a word in the name or the description.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD_PATTERN.findall(text))
+
+
+def index_title(title, using='default'):
+    if not has_search_index(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'INSERT OR REPLACE INTO {SEARCH_TABLE} '
+            '(rowid, name, description) VALUES (%s, %s, %s)',
+            [title.pk, title.name, title.description or '']
+        )
+
+
+def unindex_title(title_id, using='default'):
+    if not has_search_index(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [title_id])
+
+
+def search_titles(queryset, text):
+    """Titles matching the text, the most relevant first."""
+    query = build_match_query(text)
+    if not query:
+        return queryset.none()
+    if not has_search_index(queryset.db):
+        words = WORD_PATTERN.findall(text)
+        condition = Q()
+        for word in words:
+            condition &= (Q(name__icontains=word)
+                          | Q(description__icontains=word))
+        return queryset.filter(condition)
+    return (queryset.filter(search_index__document__match=query)
+            .order_by('search_index__rank', *queryset.query.order_by))
@@ -0,0 +1,93 @@
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal, receiver
+
+from .models import AuthorStats, Comment, Review, Title
+from .search import index_title, unindex_title
+
+# Sent by the background deletion after removing reviews or comments with
+# raw deletes, which skip the model signals. `reviews` maps the id of every
+# affected review to the id of its title.
+rows_purged = Signal(providing_args=['reviews'])
+
+
+@receiver(post_init, sender=Review)
+def remember_review_score(sender, instance, **kwargs):
+    """Remember the stored title and score to find out what an edit changed."""
+    if instance.pk is None:
+        instance._stored_score = None
+    else:
+        # Read __dict__ directly, a deferred field must not cost a query.
+        instance._stored_score = (instance.__dict__.get('title_id'),
+                                  instance.__dict__.get('score'))
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_save(sender, instance, created, **kwargs):
+    previous = None if created else instance._stored_score
+    current = (instance.title_id, instance.score)
+    instance._stored_score = current
+    if previous == current:
+        return
+    AuthorStats.objects.shift(
+        instance.author_id, reviews=int(previous is None),
+        score_sum=instance.score - (0 if previous is None else previous[1]))
+    if previous is None:
+        Title.objects.filter(pk=instance.title_id).shift_scores(
+            added=instance.score)
+    elif previous[0] != instance.title_id:
+        Title.objects.filter(pk=previous[0]).shift_scores(
+            removed=previous[1])
+        Title.objects.filter(pk=instance.title_id).shift_scores(
+            added=instance.score)
+    else:
+        Title.objects.filter(pk=instance.title_id).shift_scores(
+            added=instance.score, removed=previous[1])
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_delete(sender, instance, **kwargs):
+    Title.objects.filter(pk=instance.title_id).shift_scores(
+        removed=instance.score)
+    AuthorStats.objects.shift(instance.author_id, reviews=-1,
+                              score_sum=-instance.score,
+                              create_missing=False)
+
+
+@receiver(post_init, sender=Comment)
+def remember_comment_review(sender, instance, **kwargs):
+    instance._stored_review_id = (
+        None if instance.pk is None else instance.__dict__.get('review_id'))
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count_on_save(sender, instance, created, **kwargs):
+    previous = None if created else instance._stored_review_id
+    instance._stored_review_id = instance.review_id
+    if created:
+        AuthorStats.objects.shift(instance.author_id, comments=1)
+    if previous == instance.review_id:
+        return
+    if previous is not None:
+        Review.objects.filter(pk=previous).update(
+            comment_count=F('comment_count') - 1)
+    Review.objects.filter(pk=instance.review_id).update(
+        comment_count=F('comment_count') + 1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_comment_count_on_delete(sender, instance, **kwargs):
+    Review.objects.filter(pk=instance.review_id).update(
+        comment_count=F('comment_count') - 1)
+    AuthorStats.objects.shift(instance.author_id, comments=-1,
+                              create_missing=False)
+
+
+@receiver(post_save, sender=Title)
+def update_search_index(sender, instance, using, **kwargs):
+    index_title(instance, using)
+
+
+@receiver(post_delete, sender=Title)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    unindex_title(instance.pk, using)
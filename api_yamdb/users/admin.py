@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import User
+from .models import ConfirmationCode, OutboxEmail, User
 
 
 class UserAdmin(admin.ModelAdmin):
@@ -11,3 +11,21 @@ class UserAdmin(admin.ModelAdmin):
 
 
 admin.site.register(User, UserAdmin)
+
+
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'subject', 'recipients', 'attempts', 'send_after',)
+    search_fields = ('recipients',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
+
+
+class ConfirmationCodeAdmin(admin.ModelAdmin):
+    list_display = ('user', 'attempts', 'expires',)
+    search_fields = ('user__username',)
+    empty_value_display = '-пусто-'
+
+
+admin.site.register(ConfirmationCode, ConfirmationCodeAdmin)
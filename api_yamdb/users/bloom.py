@@ -0,0 +1,152 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from .models import User, fold_case
+
+
+class BloomFilter:
+    """
+    A set of strings answering "definitely not there" or "maybe there",
+    sized for `capacity` items at the `error_rate` of false positives.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate)
+                            / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def positions(self, value):
+        digest = hashlib.sha256(value.encode()).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:16], 'little') | 1
+        return ((first + i * second) % self.size
+                for i in range(self.hash_count))
+
+    def add(self, value):
+        for position in self.positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & 1 << (position & 7)
+                   for position in self.positions(value))
+
+
+class SignupFilter:
+    """
+    Case folded usernames and emails of all users in a Bloom filter of the
+    process, options are read from `settings.SIGNUP_FILTER`. It is built
+    by a streaming scan of the users at worker start, rebuilt in a
+    background thread every REBUILD_INTERVAL seconds and extended by a
+    receiver when a user is saved. Users added by other processes are
+    only seen after the next rebuild, so a name missing from it is a hint
+    to skip a lookup, never proof that the name is free.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.filter = None
+        self.built = 0
+        self.pending = None
+        self.thread = None
+
+    @property
+    def options(self):
+        return getattr(settings, 'SIGNUP_FILTER', {})
+
+    @property
+    def enabled(self):
+        return self.options.get('ENABLED', True)
+
+    def rebuild(self, chunk_size=2000):
+        with self.lock:
+            # Users saved during the scan are added after the swap.
+            self.pending = []
+        try:
+            bloom = BloomFilter(
+                max(self.options.get('CAPACITY', 100000),
+                    User.objects.count() * 2),
+                self.options.get('ERROR_RATE', 0.01))
+            for username, email in (User.objects.values_list(
+                    'username', 'email').iterator(chunk_size=chunk_size)):
+                bloom.add(fold_case(username))
+                bloom.add(fold_case(email))
+        finally:
+            with self.lock:
+                pending, self.pending = self.pending, None
+        with self.lock:
+            for value in pending:
+                bloom.add(value)
+            self.filter = bloom
+            self.built = time.monotonic()
+
+    def rebuild_later(self):
+        """Start a rebuild in a background thread unless one is running."""
+        with self.lock:
+            if self.thread is not None:
+                return
+            thread = self.thread = threading.Thread(
+                target=self.rebuild_in_thread, name='signup-filter',
+                daemon=True)
+        thread.start()
+
+    def rebuild_in_thread(self):
+        try:
+            self.rebuild()
+        except DatabaseError:
+            pass
+        finally:
+            connection.close()
+            with self.lock:
+                self.thread = None
+
+    def wait(self):
+        """Wait for the running background rebuild, if any."""
+        thread = self.thread
+        if thread is not None:
+            thread.join()
+
+    def warm_up(self):
+        """Build the filter at worker start if the database is ready."""
+        if not self.enabled:
+            return
+        try:
+            self.rebuild()
+        except DatabaseError:
+            pass
+
+    def add(self, *values):
+        with self.lock:
+            for value in values:
+                if self.filter is not None:
+                    self.filter.add(fold_case(value))
+                if self.pending is not None:
+                    self.pending.append(fold_case(value))
+
+    def clear(self):
+        with self.lock:
+            self.filter = None
+
+    def might_exist(self, value):
+        """
+        False if no user had the value at the last build and none was
+        saved with it by this process since. A missing or stale filter is
+        rebuilt in the background, the request is answered meanwhile.
+        """
+        if not self.enabled:
+            return True
+        bloom = self.filter
+        if bloom is None or (
+                time.monotonic() - self.built
+                > self.options.get('REBUILD_INTERVAL', 3600)):
+            self.rebuild_later()
+        return bloom is None or fold_case(value) in bloom
+
+
+signup_filter = SignupFilter()
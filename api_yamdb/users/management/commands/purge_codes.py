@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from users.models import ConfirmationCode
+
+
+class Command(BaseCommand):
+    """Deletes the confirmation codes which can not be used any more."""
+    help = 'Delete expired confirmation codes and codes out of attempts.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500,
+                            help='Codes deleted by one statement.')
+
+    def handle(self, *args, **options):
+        deleted = ConfirmationCode.objects.purge_expired(
+            options['batch_size'])
+        return f'{deleted} confirmation codes were deleted.'
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.outbox import drain_outbox
+
+
+class Command(BaseCommand):
+    """Sends the emails waiting in the outbox."""
+    help = 'Send the queued emails, retrying the failed ones with backoff.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Emails claimed at a time.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep polling the outbox as a worker.')
+        parser.add_argument('--interval', type=float, default=5,
+                            help='Seconds between polls with --loop.')
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = drain_outbox(batch_size=options['batch_size'])
+            if sent or failed or not options['loop']:
+                self.stdout.write(f'{sent} emails were sent, {failed} failed.')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,58 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:18
+
+from django.core.management.base import CommandError
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+import users.models
+
+
+def check_case_clashes(apps, schema_editor):
+    # Usernames and emails used to be unique only as typed, users that
+    # differ in case alone would make the unique indexes below fail.
+    User = apps.get_model('users', 'User')
+    clashes = []
+    for field in ('username', 'email'):
+        users = User.objects.annotate(folded=Lower(field))
+        duplicated = (users.values('folded').annotate(count=Count('id'))
+                      .filter(count__gt=1).values('folded'))
+        values = list(users.filter(folded__in=duplicated)
+                      .order_by('folded', field)
+                      .values_list(field, flat=True))
+        if values:
+            clashes.append(f'{field}: {", ".join(values)}')
+    if clashes:
+        raise CommandError(
+            'Rename or merge the users differing only in case before '
+            'migrating: ' + '; '.join(clashes))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0010_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', users.models.UserManager()),
+            ],
+        ),
+        migrations.RunPython(check_case_clashes, migrations.RunPython.noop),
+        # Expression indexes for the case-insensitive signup lookup, which
+        # Index() can only express from Django 3.2 on. They are not part of
+        # the migration state: an operation that makes SQLite rebuild
+        # users_user drops them and has to create them again, as 0012 does.
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX users_user_username_lower_idx '
+            'ON users_user (LOWER(username))',
+            'DROP INDEX users_user_username_lower_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE UNIQUE INDEX users_user_email_lower_idx '
+            'ON users_user (LOWER(email))',
+            'DROP INDEX users_user_email_lower_idx',
+        ),
+    ]
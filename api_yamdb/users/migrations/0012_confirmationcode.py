@@ -0,0 +1,62 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:25
+
+import datetime
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def move_codes(apps, schema_editor):
+    # The codes sent so far get a full TTL from now on.
+    User = apps.get_model('users', 'User')
+    ConfirmationCode = apps.get_model('users', 'ConfirmationCode')
+    expires = timezone.now() + datetime.timedelta(
+        seconds=getattr(settings, 'CONFIRMATION_CODES', {}).get('TTL', 86400))
+    ConfirmationCode.objects.bulk_create(
+        (ConfirmationCode(user_id=user_id, code=code, expires=expires)
+         for user_id, code in User.objects.exclude(confirmation_code=None)
+         .exclude(confirmation_code='')
+         .values_list('id', 'confirmation_code').iterator()),
+        batch_size=500)
+
+
+LOWER_INDEXES = [
+    'CREATE UNIQUE INDEX users_user_username_lower_idx '
+    'ON users_user (LOWER(username))',
+    'CREATE UNIQUE INDEX users_user_email_lower_idx ON users_user (LOWER(email))',
+]
+DROP_LOWER_INDEXES = [
+    'DROP INDEX users_user_username_lower_idx',
+    'DROP INDEX users_user_email_lower_idx',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_user_lower_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConfirmationCode',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('code', models.CharField(max_length=64)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('expires', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.RunPython(move_codes, migrations.RunPython.noop),
+        # SQLite rebuilds users_user to drop the column, losing the
+        # expression indexes of 0011: they are created again after it, and
+        # again after the column is added back on the way backwards.
+        migrations.RunSQL(migrations.RunSQL.noop, LOWER_INDEXES),
+        migrations.RemoveField(
+            model_name='user',
+            name='confirmation_code',
+        ),
+        migrations.RunSQL(LOWER_INDEXES, DROP_LOWER_INDEXES),
+    ]
@@ -1,5 +1,48 @@
+import datetime as dt
+import secrets
+
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.contrib.auth.models import UserManager as BaseUserManager
+from django.db import connections, models
+from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+
+ASCII_LOWER = str.maketrans(
+    'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')
+
+
+def fold_case(value):
+    """
+    Lower case the way SQLite's LOWER() does, ASCII letters only, so the
+    values compared in Python agree with the unique lower() indexes.
+    """
+    return value.translate(ASCII_LOWER)
+
+
+class UserManager(BaseUserManager):
+
+    def signup_matches(self, username, email):
+        """
+        Users with the username or the email, ignoring case, read by one
+        query served by the unique lower() indexes of both columns.
+        """
+        return list(
+            self.annotate(username_lower=Lower('username'),
+                          email_lower=Lower('email'))
+            .filter(Q(username_lower=fold_case(username))
+                    | Q(email_lower=fold_case(email)))
+        )
+
+    def username_taken(self, username):
+        return self.annotate(username_lower=Lower('username')).filter(
+            username_lower=fold_case(username)).exists()
+
+    def email_taken(self, email, exclude_pk=None):
+        return self.annotate(email_lower=Lower('email')).filter(
+            email_lower=fold_case(email)).exclude(pk=exclude_pk).exists()
 
 
 class User(AbstractUser):
@@ -44,11 +87,15 @@ class User(AbstractUser):
         blank=True,
         verbose_name='Biography'
     )
-    confirmation_code = models.CharField(
-        max_length=25,
-        null=True
+    deleted_at = models.DateTimeField(
+        null=True,
+        editable=False,
+        db_index=True,
+        verbose_name='Deletion requested'
     )
 
+    objects = UserManager()
+
     @property
     def is_user(self):
         return self.role == User.USER
@@ -63,6 +110,9 @@ class User(AbstractUser):
                 or self.is_staff)
 
     class Meta:
+        # The unique LOWER(username) and LOWER(email) indexes are raw SQL of
+        # migration 0011, unknown to the migration state: any later
+        # migration that rebuilds the table has to create them again.
         constraints = [
             models.UniqueConstraint(
                 fields=['username', 'email'],
@@ -72,3 +122,114 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class OutboxEmail(models.Model):
+    """
+    An email waiting to be sent by the `send_outbox` worker, written in
+    the transaction of the change it is about.
+    """
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    recipients = models.TextField(help_text='Comma separated addresses')
+    created = models.DateTimeField(auto_now_add=True)
+    send_after = models.DateTimeField(verbose_name='Next attempt')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['send_after', 'id'],
+                                name='outbox_send_after_idx')]
+
+    def __str__(self):
+        return f'{self.subject} to {self.recipients}'
+
+
+def get_code_option(name, default):
+    return getattr(settings, 'CONFIRMATION_CODES', {}).get(name, default)
+
+
+class ConfirmationCodeQuerySet(models.QuerySet):
+
+    def issue(self, user_id, code=None):
+        """
+        Store a new code of the user valid for TTL seconds, replacing the
+        previous one and its failed attempts, with one upsert. Returns the
+        code, a random one unless given.
+        """
+        if code is None:
+            code = secrets.token_urlsafe(16)
+        ops = connections[self.db].ops
+        expires = timezone.now() + dt.timedelta(
+            seconds=get_code_option('TTL', 86400))
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {self.model._meta.db_table} '
+                '(user_id, code, attempts, expires) VALUES (%s, %s, 0, %s) '
+                'ON CONFLICT (user_id) DO UPDATE '
+                'SET code = excluded.code, attempts = 0, '
+                'expires = excluded.expires',
+                [user_id, code, ops.adapt_datetimefield_value(expires)])
+        return code
+
+    def verify(self, username, code):
+        """
+        Id of the user with the username if the code is theirs, else None.
+        One UPDATE finds the live code of the user and either counts a
+        failed attempt or consumes the code by expiring it, so it is
+        accepted once; expired codes and codes out of attempts never match.
+        """
+        ops = connections[self.db].ops
+        now = ops.adapt_datetimefield_value(timezone.now())
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f'UPDATE {self.model._meta.db_table} '
+                'SET attempts = attempts + (code != %s), '
+                'expires = CASE WHEN code = %s THEN %s ELSE expires END '
+                f'WHERE user_id = (SELECT id FROM {User._meta.db_table} '
+                'WHERE username = %s AND deleted_at IS NULL) '
+                'AND expires > %s AND attempts < %s '
+                'RETURNING user_id, code = %s',
+                [code, code, now, username, now,
+                 get_code_option('MAX_ATTEMPTS', 5), code])
+            row = cursor.fetchone()
+        if row is None or not row[1]:
+            return None
+        return row[0]
+
+    def purge_expired(self, batch_size):
+        """
+        Delete the expired codes and the codes out of attempts a batch at
+        a time, each batch by one statement. Returns the number deleted.
+        """
+        expired = self.filter(
+            Q(expires__lte=timezone.now())
+            | Q(attempts__gte=get_code_option('MAX_ATTEMPTS', 5)))
+        deleted = 0
+        while True:
+            count, _ = self.filter(
+                pk__in=expired.values('pk')[:batch_size]).delete()
+            if not count:
+                return deleted
+            deleted += count
+
+
+class ConfirmationCode(models.Model):
+    """
+    The confirmation code sent to a user, kept out of the user row. It
+    expires after a while and after too many failed attempts.
+    """
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True
+    )
+    code = models.CharField(max_length=64)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    expires = models.DateTimeField(db_index=True)
+
+    objects = ConfirmationCodeQuerySet.as_manager()
+
+    def __str__(self):
+        return f'Code of {self.user_id}'
@@ -0,0 +1,94 @@
+import datetime as dt
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def get_option(name, default):
+    return getattr(settings, 'EMAIL_OUTBOX', {}).get(name, default)
+
+
+def queue_email(subject, message, from_email, recipient_list):
+    """
+    Put an email into the outbox in the current transaction. With the
+    SEND_ON_COMMIT option it is also sent as soon as the transaction is
+    committed, the local stand-in for a running worker.
+    """
+    email = OutboxEmail.objects.create(
+        subject=subject, body=message, from_email=from_email,
+        recipients=','.join(recipient_list), send_after=timezone.now())
+    if get_option('SEND_ON_COMMIT', False):
+        transaction.on_commit(lambda: drain_outbox(
+            OutboxEmail.objects.filter(pk=email.pk)))
+    return email
+
+
+def claim_batch(queryset, batch_size):
+    """
+    Due emails of one batch, postponed by the retry delay so another
+    worker does not pick them up while they are being sent. The batch is
+    chosen and postponed by one UPDATE ... RETURNING, so two workers can
+    never claim the same email: only the rows this one updated are sent.
+    """
+    now = timezone.now()
+    due, params = (
+        queryset.filter(send_after__lte=now,
+                        attempts__lt=get_option('MAX_ATTEMPTS', 5))
+        .order_by('send_after', 'id').values('pk')[:batch_size]
+        .query.sql_with_params())
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {OutboxEmail._meta.db_table} SET send_after = %s '
+            f'WHERE id IN ({due}) RETURNING id',
+            [connection.ops.adapt_datetimefield_value(
+                now + dt.timedelta(seconds=get_option('RETRY_DELAY', 60))),
+             *params])
+        claimed = [row[0] for row in cursor.fetchall()]
+    return list(OutboxEmail.objects.filter(pk__in=claimed).order_by('id'))
+
+
+def send_email(email, connection):
+    """
+    Send one email of the outbox. A sent email leaves the outbox, a failed
+    one is retried later with an exponentially growing delay.
+    """
+    message = EmailMessage(
+        subject=email.subject, body=email.body, from_email=email.from_email,
+        to=email.recipients.split(','), connection=connection)
+    try:
+        message.send()
+    except Exception as error:
+        email.attempts += 1
+        email.last_error = f'{type(error).__name__}: {error}'
+        email.send_after = timezone.now() + dt.timedelta(
+            seconds=get_option('RETRY_DELAY', 60) * 2 ** (email.attempts - 1))
+        email.save(update_fields=['attempts', 'last_error', 'send_after'])
+        return False
+    email.delete()
+    return True
+
+
+def drain_outbox(queryset=None, batch_size=None):
+    """
+    Send the due emails batch by batch over one connection until none is
+    left. Returns the numbers of sent and failed emails.
+    """
+    if queryset is None:
+        queryset = OutboxEmail.objects.all()
+    batch_size = batch_size or get_option('BATCH_SIZE', 100)
+    sent = failed = 0
+    with get_connection() as connection:
+        while True:
+            batch = claim_batch(queryset, batch_size)
+            if not batch:
+                return sent, failed
+            for email in batch:
+                if send_email(email, connection):
+                    sent += 1
+                else:
+                    failed += 1
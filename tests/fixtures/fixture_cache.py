@@ -0,0 +1,14 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    from django.core.cache import caches
+    from api.authentication import token_cache, user_cache
+    from users.bloom import signup_filter
+
+    for cache in caches.all():
+        cache.clear()
+    user_cache.clear()
+    token_cache.clear()
+    signup_filter.clear()
@@ -0,0 +1,12 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def test_settings(settings, tmp_path):
+    # Throttle counters in a file of the test, not the one of the project.
+    settings.THROTTLE_STORE = {'PATH': str(tmp_path / 'throttle.sqlite3')}
+    # Signup emails are expected in `mail.outbox` right after the request.
+    settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'SEND_ON_COMMIT': True}
+    # Rebuilds of the signup filter in a background thread would race the
+    # test database, the tests of the filter enable it and build it in place.
+    settings.SIGNUP_FILTER = {**settings.SIGNUP_FILTER, 'ENABLED': False}
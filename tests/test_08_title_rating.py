@@ -0,0 +1,38 @@
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test08TitleRating:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_rating_follows_review_changes(self, admin_client, admin):
+        from reviews.models import Title
+
+        reviews, titles, user, moderator = create_reviews(admin_client, admin)
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.review_count, title.score_sum, title.rating) == (3, 12, 4), (
+            'Проверьте, что при создании отзывов у произведения обновляются '
+            '`review_count`, `score_sum` и `rating`'
+        )
+
+        auth_client(user).patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'text': 'jdfk', 'score': 9}
+        )
+        title.refresh_from_db()
+        assert (title.review_count, title.score_sum, title.rating) == (3, 18, 6), (
+            'Проверьте, что при изменении оценки отзыва пересчитывается `rating` произведения'
+        )
+
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/')
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/')
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') == 4, (
+            'Проверьте, что при удалении отзыва пересчитывается `rating` произведения'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[2]["id"]}/')
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json().get('rating') is None, (
+            'Проверьте, что после удаления всех отзывов `rating` произведения равен `None`'
+        )
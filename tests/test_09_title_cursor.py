@@ -0,0 +1,65 @@
+import base64
+import json
+
+import pytest
+
+from .common import create_categories, create_genre
+
+
+class Test09TitleCursorPagination:
+
+    def create_many_titles(self, admin_client, amount):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        for number in range(amount):
+            admin_client.post('/api/v1/titles/', data={
+                'name': f'Произведение {number % 5}', 'year': 2000,
+                'genre': [genres[number % 2]['slug']],
+                'category': categories[0]['slug']
+            })
+        return genres
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cursor_walks_whole_catalogue(self, client, admin_client):
+        self.create_many_titles(admin_client, 23)
+        response = client.get('/api/v1/titles/?pagination=cursor')
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/titles/?pagination=cursor` возвращает статус 200'
+        )
+        data = response.json()
+        assert 'count' not in data and data['previous'] is None, (
+            'Проверьте, что в режиме курсорной пагинации без `with_count` не возвращается `count`'
+        )
+        seen = [title['id'] for title in data['results']]
+        pages = [data]
+        while data['next']:
+            data = client.get(data['next']).json()
+            pages.append(data)
+            seen.extend(title['id'] for title in data['results'])
+        assert len(seen) == 23 and len(set(seen)) == 23, (
+            'Проверьте, что ссылки `next` курсорной пагинации обходят все произведения без повторов'
+        )
+        back = client.get(pages[-1]['previous']).json()
+        assert back['results'] == pages[-2]['results'], (
+            'Проверьте, что ссылка `previous` курсорной пагинации возвращает предыдущую страницу'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_cursor_with_filters_and_count(self, client, admin_client):
+        genres = self.create_many_titles(admin_client, 12)
+        response = client.get(
+            f'/api/v1/titles/?pagination=cursor&with_count=1&genre={genres[0]["slug"]}')
+        data = response.json()
+        assert data.get('count') == 6, (
+            'Проверьте, что курсорная пагинация учитывает фильтры и возвращает `count` по запросу'
+        )
+        response = client.get('/api/v1/titles/?cursor=broken')
+        assert response.status_code == 404, (
+            'Проверьте, что для некорректного курсора возвращается статус 404'
+        )
+        for position in (['Имя', 'abc'], ['Имя', None], ['Имя', {'id': 1}], 'Имя'):
+            cursor = base64.urlsafe_b64encode(json.dumps([0, position]).encode()).decode()
+            response = client.get('/api/v1/titles/', {'cursor': cursor})
+            assert response.status_code == 404, (
+                'Проверьте, что курсор с некорректными значениями возвращает статус 404'
+            )
@@ -0,0 +1,46 @@
+import pytest
+
+from .common import create_titles
+
+
+class Test10TitleSearch:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_search_by_prefix(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get('/api/v1/titles/?q=пов')
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/titles/?q=` возвращает статус 200'
+        )
+        results = response.json()['results']
+        assert [title['id'] for title in results] == [titles[0]['id']], (
+            'Проверьте, что параметр `q` ищет произведения по началу слов в названии'
+        )
+        results = client.get('/api/v1/titles/?q=драма').json()['results']
+        assert [title['id'] for title in results] == [titles[1]['id']], (
+            'Проверьте, что параметр `q` ищет произведения по описанию'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_search_index_follows_changes(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        admin_client.patch(f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Новинка'})
+        results = client.get('/api/v1/titles/?q=новин').json()['results']
+        assert [title['id'] for title in results] == [titles[1]['id']], (
+            'Проверьте, что поисковый индекс обновляется при изменении произведения'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[1]["id"]}/')
+        results = client.get('/api/v1/titles/?q=новин').json()['results']
+        assert results == [], (
+            'Проверьте, что удаленное произведение не находится поиском'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_search_refuses_cursor(self, client, admin_client):
+        create_titles(admin_client)
+        for params in ({'q': 'пов', 'pagination': 'cursor'}, {'q': 'пов', 'cursor': 'abc'}):
+            response = client.get('/api/v1/titles/', params)
+            assert response.status_code == 400, (
+                'Проверьте, что поиск `q` не сочетается с курсорной пагинацией, '
+                'которая потеряла бы порядок по релевантности'
+            )
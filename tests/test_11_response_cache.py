@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+class Test11ResponseCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cached_lists(self, client, admin_client, django_assert_num_queries):
+        titles, _, genres = create_titles(admin_client)
+        for url in ('/api/v1/titles/', '/api/v1/genres/', '/api/v1/categories/'):
+            client.get(url)
+            with django_assert_num_queries(0):
+                response = client.get(url)
+            assert response.status_code == 200, (
+                f'Проверьте, что повторный GET запрос `{url}` отдается из кэша со статусом 200'
+            )
+        admin_client.post('/api/v1/genres/', data={'name': 'Мюзикл', 'slug': 'musical'})
+        response = client.get('/api/v1/genres/')
+        assert response.json()['count'] == len(genres) + 1, (
+            'Проверьте, что создание жанра сбрасывает кэш списка жанров'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_review_invalidates_only_its_title(self, client, admin_client,
+                                                   django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        first = f'/api/v1/titles/{titles[0]["id"]}/'
+        second = f'/api/v1/titles/{titles[1]["id"]}/'
+        client.get(first)
+        client.get(second)
+        admin_client.post(f'{first}reviews/', data={'text': 'Супер', 'score': 8})
+        assert client.get(first).json()['rating'] == 8, (
+            'Проверьте, что новый отзыв сбрасывает кэш своего произведения'
+        )
+        # Only the ETag of the title reads its category and genre slugs.
+        with django_assert_num_queries(1):
+            client.get(second)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_write_during_read_is_not_cached(self, client, admin_client, monkeypatch):
+        from api.cache import response_cache
+        from api.views import TitleViewSet
+
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        get_response_tags = TitleViewSet.get_response_tags
+
+        def write_meanwhile(self, data):
+            # A write committed after the data was read.
+            response_cache.invalidate(f'title:{titles[0]["id"]}')
+            return get_response_tags(self, data)
+
+        monkeypatch.setattr(TitleViewSet, 'get_response_tags', write_meanwhile)
+        client.get(url)
+        monkeypatch.undo()
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        assert len(queries) > 1, (
+            'Проверьте, что ответ, прочитанный до записи, не попадает в кэш '
+            'с версиями тегов после неё'
+        )
+        with CaptureQueriesContext(connection) as queries:
+            client.get(url)
+        assert len(queries) == 1
@@ -0,0 +1,86 @@
+import pytest
+
+from .common import create_comments, create_titles
+
+
+class Test12ConditionalGet:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_not_modified(self, client, admin_client, admin, django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        # The title ETag reads the slugs of its category and genres.
+        urls = (
+            (f'/api/v1/titles/{title_id}/', 1),
+            (f'/api/v1/titles/{title_id}/reviews/', 0),
+            (f'/api/v1/titles/{title_id}/reviews/{review_id}/comments/', 0),
+        )
+        for url, queries in urls:
+            response = client.get(url)
+            etag = response.get('ETag')
+            assert response.status_code == 200 and etag, (
+                f'Проверьте, что GET запрос `{url}` возвращает заголовок `ETag`'
+            )
+            with django_assert_num_queries(queries):
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == 304, (
+                f'Проверьте, что GET запрос `{url}` с актуальным `If-None-Match` возвращает статус 304'
+            )
+        missing = (
+            '/api/v1/titles/9999/',
+            '/api/v1/titles/9999/reviews/',
+            f'/api/v1/titles/{title_id}/reviews/9999/comments/',
+        )
+        for url in missing:
+            assert client.get(url, HTTP_IF_NONE_MATCH='*').status_code == 404, (
+                f'Проверьте, что GET запрос `{url}` к несуществующему объекту с `If-None-Match: *` '
+                'возвращает статус 404'
+            )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_changes_refresh_etag(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        title_id, review_id = titles[0]['id'], reviews[0]['id']
+        reviews_url = f'/api/v1/titles/{title_id}/reviews/'
+        comments_url = f'{reviews_url}{review_id}/comments/'
+        reviews_etag = client.get(reviews_url)['ETag']
+        comments_etag = client.get(comments_url)['ETag']
+        admin_client.post(comments_url, data={'text': 'Новый'})
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=comments_etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый комментарий меняет `ETag` списка комментариев'
+        )
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == 200, (
+            'Проверьте, что новый комментарий меняет `ETag` списка отзывов, '
+            'в котором выводится число комментариев'
+        )
+        reviews_etag = response['ETag']
+        admin_client.patch(f'{reviews_url}{review_id}/', data={'text': 'Иначе', 'score': 2})
+        response = client.get(reviews_url, HTTP_IF_NONE_MATCH=reviews_etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение отзыва меняет `ETag` списка отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_category_and_genre_refresh_title_etag(self, client, admin_client):
+        from reviews.models import Category, Genre
+
+        titles, categories, genres = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        etag, title = response['ETag'], response.json()
+        genre = Genre.objects.get(slug=title['genre'][0]['slug'])
+        genre.name = 'Другое имя'
+        genre.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что переименование жанра меняет `ETag` произведения'
+        )
+        etag = response['ETag']
+        admin_client.delete(f'/api/v1/categories/{title["category"]["slug"]}/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and not response.json()['category']['slug'], (
+            'Проверьте, что удаление категории меняет `ETag` произведения'
+        )
+        assert Category.objects.count() == len(categories) - 1
@@ -0,0 +1,57 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_categories, create_genre
+
+
+class Test13TitleGenres:
+
+    def post_title(self, admin_client, genres, category):
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post('/api/v1/titles/', data={
+                'name': 'Произведение', 'year': 2000, 'category': category,
+                'genre': [genre['slug'] for genre in genres]
+            })
+        assert response.status_code == 201, (
+            'Проверьте, что при POST запросе `/api/v1/titles/` с правильными данными возвращает статус 201'
+        )
+        return response.json(), len(context)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_fixed_number_of_queries(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        _, one_genre = self.post_title(admin_client, genres[:1], categories[0]['slug'])
+        _, all_genres = self.post_title(admin_client, genres, categories[0]['slug'])
+        assert one_genre == all_genres, (
+            'Проверьте, что количество запросов при создании произведения не зависит от числа жанров'
+        )
+        response = admin_client.post('/api/v1/titles/', data={
+            'name': 'Ошибка', 'year': 2000, 'category': categories[0]['slug'],
+            'genre': [genres[0]['slug'], 'unknown']
+        })
+        assert response.status_code == 400, (
+            'Проверьте, что при POST запросе `/api/v1/titles/` с несуществующим жанром возвращается статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_update_genres(self, admin_client):
+        from reviews.models import GenreTitle
+
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        title, _ = self.post_title(admin_client, genres[:2], categories[0]['slug'])
+        kept = GenreTitle.objects.get(title_id=title['id'], genre__slug=genres[1]['slug'])
+        response = admin_client.patch(f'/api/v1/titles/{title["id"]}/', data={
+            'genre': [genres[1]['slug'], genres[2]['slug']]
+        })
+        assert response.status_code == 200, (
+            'Проверьте, что при PATCH запросе `/api/v1/titles/{title_id}/` возвращается статус 200'
+        )
+        assert response.json()['genre'] == [genres[1], genres[2]], (
+            'Проверьте, что при PATCH запросе `/api/v1/titles/{title_id}/` меняются жанры произведения'
+        )
+        assert GenreTitle.objects.filter(pk=kept.pk).exists(), (
+            'Проверьте, что при изменении жанров сохраненные связи не пересоздаются'
+        )
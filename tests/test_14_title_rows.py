@@ -0,0 +1,23 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_reviews
+
+
+class Test14TitleRows:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_list_matches_detail(self, client, admin_client, admin):
+        _, titles, _, _ = create_reviews(admin_client, admin)
+        with CaptureQueriesContext(connection) as context:
+            results = client.get('/api/v1/titles/').json()['results']
+        assert len(context) == 2, (
+            'Проверьте, что страница списка произведений строится одним запросом и запросом `count`'
+        )
+        for title in results:
+            detail = client.get(f'/api/v1/titles/{title["id"]}/').json()
+            assert title == detail, (
+                'Проверьте, что произведение в списке `/api/v1/titles/` имеет тот же вид, '
+                'что и в `/api/v1/titles/{title_id}/`'
+            )
@@ -0,0 +1,47 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from .common import create_titles
+
+
+class Test15TitleFacets:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_multi_value_filters(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        url = f'/api/v1/titles/?genre={genres[0]["slug"]},{genres[2]["slug"]}'
+        assert client.get(url).json()['count'] == 2, (
+            'Проверьте, что фильтр `genre` со списком жанров находит произведения с любым из них'
+        )
+        url = f'/api/v1/titles/?genre={genres[0]["slug"]},{genres[1]["slug"]}&genre_mode=all'
+        results = client.get(url).json()['results']
+        assert [title['id'] for title in results] == [titles[0]['id']], (
+            'Проверьте, что `genre_mode=all` находит произведения со всеми жанрами из списка'
+        )
+        url = f'/api/v1/titles/?genre={genres[0]["slug"]},{genres[2]["slug"]}&genre_mode=all'
+        assert client.get(url).json()['count'] == 0, (
+            'Проверьте, что `genre_mode=all` не находит произведения без одного из жанров'
+        )
+        url = f'/api/v1/titles/?category={categories[0]["slug"]},{categories[1]["slug"]}&year_min=2010'
+        results = client.get(url).json()['results']
+        assert [title['id'] for title in results] == [titles[1]['id']], (
+            'Проверьте, что фильтры `category` и `year_min` работают вместе'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_facets(self, client, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        with CaptureQueriesContext(connection) as context:
+            data = client.get('/api/v1/titles/?facets=true&year_max=2010').json()
+        assert len(context) == 3, (
+            'Проверьте, что фасеты считаются одним запросом'
+        )
+        assert data['facets'] == {
+            'genre': {genres[0]['slug']: 1, genres[1]['slug']: 1},
+            'category': {categories[0]['slug']: 1},
+            'decade': {'2000': 1},
+        }, (
+            'Проверьте, что `facets` содержит количество найденных произведений по жанрам, '
+            'категориям и десятилетиям'
+        )
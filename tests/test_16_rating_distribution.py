@@ -0,0 +1,34 @@
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test16RatingDistribution:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_distribution(self, client, admin_client, admin, django_assert_num_queries):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/rating-distribution/'
+        with django_assert_num_queries(1):
+            response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что GET запрос `{url}` возвращает статус 200'
+        )
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected.update({'3': 1, '4': 1, '5': 1})
+        assert response.json() == {'count': 3, 'rating': 4, 'scores': expected}, (
+            'Проверьте, что распределение оценок совпадает с отзывами произведения'
+        )
+        auth_client(user).patch(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[1]["id"]}/',
+            data={'text': 'jdfk', 'score': 10}
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/')
+        expected.update({'3': 0, '5': 0, '10': 1})
+        assert client.get(url).json() == {'count': 2, 'rating': 7, 'scores': expected}, (
+            'Проверьте, что распределение оценок обновляется при изменении и удалении отзывов'
+        )
+        response = client.get('/api/v1/titles/0/rating-distribution/')
+        assert response.status_code == 404, (
+            'Проверьте, что для несуществующего произведения возвращается статус 404'
+        )
@@ -0,0 +1,34 @@
+import pytest
+from django.core.management import call_command
+
+from .common import create_reviews
+
+
+class Test17Leaderboards:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_top_and_trending(self, client, admin_client, admin):
+        reviews, titles, _, _ = create_reviews(admin_client, admin)
+        admin_client.post(f'/api/v1/titles/{titles[1]["id"]}/reviews/', data={'text': 'Ого', 'score': 9})
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200 and response.json() == [], (
+            'Проверьте, что GET запрос `/api/v1/titles/top/` возвращает статус 200 '
+            'и пустой список до пересчета рейтингов'
+        )
+        call_command('refresh_leaderboards')
+        top = client.get('/api/v1/titles/top/').json()
+        assert [title['id'] for title in top] == [titles[1]['id'], titles[0]['id']], (
+            'Проверьте, что `/api/v1/titles/top/` упорядочен по среднему рейтингу'
+        )
+        assert top[0] == client.get(f'/api/v1/titles/{titles[1]["id"]}/').json(), (
+            'Проверьте, что произведения в `/api/v1/titles/top/` имеют обычный вид'
+        )
+        trending = client.get('/api/v1/titles/trending/').json()
+        assert [title['id'] for title in trending] == [titles[0]['id'], titles[1]['id']], (
+            'Проверьте, что `/api/v1/titles/trending/` упорядочен по числу свежих отзывов'
+        )
+        genre = titles[1]['genre'][0]
+        top = client.get(f'/api/v1/titles/top/?genre={genre}').json()
+        assert [title['id'] for title in top] == [titles[1]['id']], (
+            'Проверьте, что `/api/v1/titles/top/?genre=` возвращает рейтинг жанра'
+        )
@@ -0,0 +1,55 @@
+import base64
+import json
+
+import pytest
+
+from .common import auth_client, create_comments
+
+
+class Test18ReviewCursorPagination:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_reviews_cursor(self, client, admin_client, admin, django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with django_assert_num_queries(1):
+            data = client.get(f'{url}?pagination=cursor').json()
+        assert [review['id'] for review in data['results']] == [review['id'] for review in reviews], (
+            'Проверьте, что отзывы в курсорном режиме упорядочены по дате публикации'
+        )
+        assert 'count' not in data and data['next'] is None, (
+            'Проверьте, что курсорная пагинация отзывов не считает `count` без `with_count`'
+        )
+        for position in (['2020-13-45T00:00:00', 1], [1, 1], ['2020-01-01T00:00:00', 'abc']):
+            cursor = base64.urlsafe_b64encode(json.dumps([1, position]).encode()).decode()
+            response = client.get(url, {'cursor': cursor})
+            assert response.status_code == 404 and response.json() == {'detail': 'Invalid cursor.'}, (
+                'Проверьте, что курсор с некорректной датой или id возвращает статус 404'
+            )
+        response = client.get('/api/v1/titles/0/reviews/?pagination=cursor')
+        assert response.status_code == 404, (
+            'Проверьте, что для несуществующего произведения список отзывов возвращает статус 404'
+        )
+        response = client.get(f'/api/v1/titles/{titles[1]["id"]}/reviews/')
+        assert response.status_code == 200 and response.json()['count'] == 0, (
+            'Проверьте, что для произведения без отзывов возвращается пустой список'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_comments_cursor(self, client, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/comments/'
+        user_client = auth_client(user)
+        for number in range(10):
+            user_client.post(url, data={'text': f'Комментарий {number}'})
+        data = client.get(f'{url}?pagination=cursor').json()
+        seen = [comment['id'] for comment in data['results']]
+        data = client.get(data['next']).json()
+        seen.extend(comment['id'] for comment in data['results'])
+        assert seen == sorted(seen) and len(seen) == 13, (
+            'Проверьте, что курсорная пагинация комментариев обходит все комментарии по порядку'
+        )
+        response = client.get(f'/api/v1/titles/{titles[0]["id"]}/reviews/0/comments/')
+        assert response.status_code == 404, (
+            'Проверьте, что для несуществующего отзыва список комментариев возвращает статус 404'
+        )
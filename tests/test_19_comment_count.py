@@ -0,0 +1,23 @@
+import pytest
+
+from .common import create_comments
+
+
+class Test19CommentCount:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_comment_count(self, client, admin_client, admin, django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with django_assert_num_queries(2):
+            results = client.get(url).json()['results']
+        counts = {review['id']: review['comment_count'] for review in results}
+        assert counts == {reviews[0]['id']: 3, reviews[1]['id']: 0, reviews[2]['id']: 0}, (
+            'Проверьте, что `comment_count` отзыва равен числу его комментариев'
+        )
+        admin_client.delete(f'{url}{reviews[0]["id"]}/comments/{comments[0]["id"]}/')
+        admin_client.patch(f'{url}{reviews[0]["id"]}/', data={'text': 'Иначе', 'score': 6})
+        response = client.get(f'{url}{reviews[0]["id"]}/')
+        assert response.json()['comment_count'] == 2, (
+            'Проверьте, что удаление комментария уменьшает `comment_count` отзыва'
+        )
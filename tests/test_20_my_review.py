@@ -0,0 +1,96 @@
+import pytest
+
+from .common import auth_client, create_reviews
+
+
+class Test20MyReview:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_duplicate_review(self, admin_client, admin):
+        _, titles, user, _ = create_reviews(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = auth_client(user).post(url, data={'text': 'Ещё раз', 'score': 9})
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв на произведение возвращает статус 400'
+        )
+        assert response.json() == {'non_field_errors': ['You can write just one review!']}, (
+            'Проверьте, что повторный отзыв возвращает прежнее сообщение об ошибке'
+        )
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 4, (
+            'Проверьте, что отклонённый отзыв не меняет рейтинг произведения'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_put_mine(self, admin_client, admin):
+        reviews, titles, user, _ = create_reviews(admin_client, admin)
+        user_client = auth_client(user)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/mine/'
+
+        response = user_client.put(url, data={'text': 'Передумал', 'score': 9})
+        assert response.status_code == 200, (
+            'Проверьте, что `PUT` на `reviews/mine/` заменяет существующий отзыв и возвращает статус 200'
+        )
+        data = response.json()
+        assert data['id'] == reviews[1]['id'] and data['score'] == 9 and data['text'] == 'Передумал', (
+            'Проверьте, что `PUT` на `reviews/mine/` заменяет отзыв пользователя'
+        )
+        assert data['author'] == user.username
+        title = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/').json()
+        assert title['rating'] == 6, (
+            'Проверьте, что замена отзыва пересчитывает рейтинг произведения'
+        )
+        distribution = admin_client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/rating-distribution/').json()['scores']
+        assert distribution['3'] == 0 and distribution['9'] == 1
+
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/mine/'
+        response = user_client.put(url, data={'text': 'Первый', 'score': 7})
+        assert response.status_code == 201, (
+            'Проверьте, что `PUT` на `reviews/mine/` создаёт отзыв и возвращает статус 201'
+        )
+        title = admin_client.get(f'/api/v1/titles/{titles[1]["id"]}/').json()
+        assert title['rating'] == 7
+        response = admin_client.get(f'/api/v1/titles/{titles[1]["id"]}/reviews/')
+        assert response.json()['count'] == 1
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_put_mine_errors(self, client, admin_client):
+        url = '/api/v1/titles/1000/reviews/mine/'
+        assert client.put(url, data={'text': 'Нет', 'score': 5}).status_code == 401, (
+            'Проверьте, что `PUT` на `reviews/mine/` без токена возвращает статус 401'
+        )
+        assert admin_client.put(url, data={'text': 'Нет', 'score': 5}).status_code == 404, (
+            'Проверьте, что `PUT` на `reviews/mine/` несуществующего произведения возвращает статус 404'
+        )
+        assert admin_client.put(url, data={'text': 'Нет', 'score': 11}).status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_other_integrity_errors(self, admin_client, admin, monkeypatch):
+        from django.db import IntegrityError
+        from rest_framework.serializers import ModelSerializer
+        from reviews.models import Review
+
+        _, titles, user, _ = create_reviews(admin_client, admin)
+
+        def fail(self, validated_data):
+            raise IntegrityError('FOREIGN KEY constraint failed')
+
+        monkeypatch.setattr(ModelSerializer, 'create', fail)
+        url = f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+        with pytest.raises(IntegrityError):
+            auth_client(user).post(url, data={'text': 'Новый', 'score': 5})
+        monkeypatch.undo()
+
+        title_id = titles[0]['id']
+        for score in (10, 2):
+            review, created = Review.objects.upsert(title_id, user, 'Снова', score)
+            assert not created
+        scores = list(Review.objects.filter(title_id=title_id).values_list('score', flat=True))
+        title = admin_client.get(f'/api/v1/titles/{title_id}/').json()
+        assert title['rating'] == sum(scores) // len(scores), (
+            'Проверьте, что замена отзыва учитывает прежнюю оценку, прочитанную в той же транзакции'
+        )
+        distribution = admin_client.get(
+            f'/api/v1/titles/{title_id}/rating-distribution/').json()['scores']
+        assert distribution['10'] == 0 and distribution['2'] == scores.count(2)
@@ -0,0 +1,41 @@
+import json
+
+import pytest
+
+from .common import create_comments
+
+
+class Test21TitleExport:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_export(self, client, admin_client, admin, django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/export.ndjson'
+        with django_assert_num_queries(3):
+            response = client.get(url)
+            assert response.streaming, (
+                'Проверьте, что экспорт отдаётся потоком `StreamingHttpResponse`'
+            )
+            lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert [(line['type'], line['id']) for line in lines] == [
+            ('title', titles[0]['id']),
+            ('review', reviews[0]['id']),
+            *(('comment', comment['id']) for comment in comments),
+            ('review', reviews[1]['id']),
+            ('review', reviews[2]['id']),
+        ], (
+            'Проверьте, что экспорт выводит произведение, затем каждый отзыв, а за ним его комментарии'
+        )
+        review = lines[1]
+        assert review['author'] == reviews[0]['author'] and review['score'] == reviews[0]['score']
+        assert review['pub_date'] == client.get(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/').json()['pub_date']
+        assert lines[2]['review_id'] == reviews[0]['id'] and lines[2]['text'] == comments[0]['text']
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_export_not_found(self, client):
+        assert client.get('/api/v1/titles/1000/export.ndjson').status_code == 404, (
+            'Проверьте, что экспорт несуществующего произведения возвращает статус 404'
+        )
@@ -0,0 +1,50 @@
+import pytest
+
+from .common import create_comments
+
+
+class Test22ReviewExpand:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_expand_comments(self, client, admin_client, admin, django_assert_num_queries):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        with django_assert_num_queries(3):
+            response = client.get(url, {'expand': 'comments', 'comments_limit': 2})
+        assert response.status_code == 200
+        results = {review['id']: review for review in response.json()['results']}
+        assert [comment['id'] for comment in results[reviews[0]['id']]['comments']] == [
+            comments[2]['id'], comments[1]['id']
+        ], (
+            'Проверьте, что `expand=comments` добавляет к отзыву не более `comments_limit` '
+            'последних комментариев, новые первыми'
+        )
+        assert results[reviews[1]['id']]['comments'] == []
+        comment = results[reviews[0]['id']]['comments'][0]
+        assert comment['author'] == comments[2]['author'] and comment['text'] == comments[2]['text']
+
+        response = client.get(url)
+        assert 'comments' not in response.json()['results'][0], (
+            'Проверьте, что без `expand=comments` комментарии к отзывам не добавляются'
+        )
+        response = client.get(url, {'expand': 'comments'})
+        assert len(response.json()['results'][0]['comments']) == 3
+        response = client.get(url, {'expand': 'comments', 'comments_limit': 'many'})
+        assert response.status_code == 400, (
+            'Проверьте, что некорректный `comments_limit` возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_expand_etag(self, client, admin_client, admin):
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = client.get(url, {'expand': 'comments'})
+        etag = response['ETag']
+        admin_client.delete(f'{url}{reviews[0]["id"]}/comments/{comments[2]["id"]}/')
+        response = client.get(url, {'expand': 'comments'}, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что удаление комментария меняет ETag списка отзывов'
+        )
+        review = next(item for item in response.json()['results'] if item['id'] == reviews[0]['id'])
+        assert review['comment_count'] == 2
+        assert [comment['id'] for comment in review['comments']] == [comments[1]['id'], comments[0]['id']]
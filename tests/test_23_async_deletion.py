@@ -0,0 +1,81 @@
+import pytest
+from django.core.management import call_command
+
+from .common import auth_client, create_comments
+
+
+class Test23AsyncDeletion:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_title_deletion(self, settings, client, admin_client, admin):
+        from reviews.models import Comment, Review, Title
+
+        settings.ASYNC_DELETION = True
+        comments, reviews, titles, _, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = admin_client.delete(url)
+        assert response.status_code == 202, (
+            'Проверьте, что при фоновом удалении DELETE произведения возвращает статус 202'
+        )
+        assert client.get(url).status_code == 404, (
+            'Проверьте, что произведение, ожидающее удаления, сразу скрывается'
+        )
+        assert client.get(f'{url}reviews/').status_code == 404
+        assert client.get(f'{url}reviews/{reviews[0]["id"]}/comments/').status_code == 404, (
+            'Проверьте, что комментарии к отзывам скрытого произведения не показываются'
+        )
+        response = admin_client.post(f'{url}reviews/{reviews[0]["id"]}/comments/', data={'text': 'Поздно'})
+        assert response.status_code == 404, (
+            'Проверьте, что к отзывам скрытого произведения нельзя добавить комментарий'
+        )
+        assert client.get('/api/v1/titles/').json()['count'] == 1
+        assert Review.objects.filter(title_id=titles[0]['id']).count() == 3
+
+        call_command('purge_deleted', chunk_size=2)
+        assert not Title.all_objects.filter(pk=titles[0]['id']).exists(), (
+            'Проверьте, что команда `purge_deleted` удаляет скрытое произведение'
+        )
+        assert Review.objects.count() == 0 and Comment.objects.count() == 0, (
+            'Проверьте, что команда `purge_deleted` удаляет отзывы и комментарии произведения'
+        )
+        assert client.get(f'/api/v1/titles/{titles[1]["id"]}/').status_code == 200
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_user_deletion(self, settings, client, admin_client, admin):
+        from reviews.models import Comment, Review
+        from users.models import User
+
+        settings.ASYNC_DELETION = True
+        comments, reviews, titles, user, _ = create_comments(admin_client, admin)
+        user_client = auth_client(user)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 202, (
+            'Проверьте, что при фоновом удалении DELETE пользователя возвращает статус 202'
+        )
+        assert admin_client.get(f'/api/v1/users/{user.username}/').status_code == 404
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен пользователя, ожидающего удаления, перестаёт действовать'
+        )
+
+        call_command('purge_deleted', chunk_size=1)
+        assert not User.objects.filter(pk=user.pk).exists()
+        assert not Review.objects.filter(author_id=user.pk).exists()
+        assert not Comment.objects.filter(author_id=user.pk).exists()
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(title_url).json()['rating'] == 4, (
+            'Проверьте, что фоновое удаление пользователя пересчитывает рейтинг произведений'
+        )
+        distribution = client.get(f'{title_url}rating-distribution/').json()
+        assert distribution['count'] == 2 and distribution['scores']['3'] == 0
+        review = client.get(f'{title_url}reviews/{reviews[0]["id"]}/').json()
+        assert review['comment_count'] == 2, (
+            'Проверьте, что фоновое удаление пользователя пересчитывает число комментариев отзывов'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_sync_deletion_by_default(self, admin_client, admin):
+        _, _, titles, _, _ = create_comments(admin_client, admin)
+        response = admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.status_code == 204, (
+            'Проверьте, что без настройки `ASYNC_DELETION` произведение удаляется сразу'
+        )
@@ -0,0 +1,67 @@
+import pytest
+
+from .common import auth_client, create_comments
+
+
+class Test24UserActivity:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_activity_lists(self, client, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(admin_client, admin)
+        response = client.get(f'/api/v1/users/{user.username}/reviews/')
+        assert response.status_code == 200, (
+            'Проверьте, что GET запрос `/api/v1/users/{username}/reviews/` доступен без токена'
+        )
+        data = response.json()
+        assert [review['id'] for review in data['results']] == [reviews[1]['id']], (
+            'Проверьте, что `/api/v1/users/{username}/reviews/` возвращает отзывы пользователя'
+        )
+        assert data['results'][0]['title'] == titles[0]['id']
+        assert 'next' in data and 'previous' in data
+
+        response = client.get(f'/api/v1/users/{user.username}/comments/')
+        results = response.json()['results']
+        assert [comment['id'] for comment in results] == [comments[1]['id']], (
+            'Проверьте, что `/api/v1/users/{username}/comments/` возвращает комментарии пользователя'
+        )
+        assert results[0]['review'] == reviews[0]['id'] and results[0]['title'] == titles[0]['id']
+        assert client.get('/api/v1/users/nobody/reviews/').status_code == 404
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_activity_cursor(self, client, admin_client, admin):
+        from reviews.models import Review, Title
+
+        create_comments(admin_client, admin)
+        for i in range(12):
+            title = Title.objects.create(name=f'Книга {i}', year=2000)
+            Review.objects.create(title=title, author=admin, text='Текст', score=7)
+        url = f'/api/v1/users/{admin.username}/reviews/'
+        data = client.get(url, {'with_count': 'true'}).json()
+        seen = [review['id'] for review in data['results']]
+        assert data['count'] == 13 and len(seen) == 10
+        data = client.get(data['next']).json()
+        seen += [review['id'] for review in data['results']]
+        assert seen == list(Review.objects.filter(author=admin).order_by('pub_date', 'id')
+                            .values_list('id', flat=True)), (
+            'Проверьте, что `/api/v1/users/{username}/reviews/` листается курсором в порядке публикации'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_profile_stats(self, admin_client, admin):
+        comments, reviews, titles, user, _ = create_comments(admin_client, admin)
+        url = f'/api/v1/users/{user.username}/'
+        stats = admin_client.get(url).json()['stats']
+        assert stats == {'review_count': 1, 'comment_count': 1, 'average_score': 3.0}, (
+            'Проверьте, что профиль пользователя содержит число его отзывов, комментариев и среднюю оценку'
+        )
+        user_client = auth_client(user)
+        user_client.put(f'/api/v1/titles/{titles[1]["id"]}/reviews/mine/', data={'text': 'Да', 'score': 8})
+        stats = user_client.get('/api/v1/users/me/').json()['stats']
+        assert stats == {'review_count': 2, 'comment_count': 1, 'average_score': 5.5}, (
+            'Проверьте, что счётчики профиля обновляются при новом отзыве'
+        )
+        admin_client.delete(f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/')
+        stats = admin_client.get(url).json()['stats']
+        assert stats['comment_count'] == 0, (
+            'Проверьте, что удаление отзыва вместе с комментариями уменьшает их число в профиле авторов'
+        )
@@ -0,0 +1,30 @@
+import pytest
+
+from .common import auth_client, create_users_api
+
+
+class Test25UserCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cached_user(self, admin_client, django_assert_num_queries):
+        user, _ = create_users_api(admin_client)
+        user_client = auth_client(user)
+        url = f'/api/v1/users/{user.username}/reviews/'
+        with django_assert_num_queries(3):
+            assert user_client.get(url).status_code == 200
+        with django_assert_num_queries(2):
+            response = user_client.get(url)
+        assert response.status_code == 200, (
+            'Проверьте, что повторный запрос с тем же токеном не загружает пользователя из базы'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_user_change_invalidates(self, admin_client):
+        user, _ = create_users_api(admin_client)
+        user_client = auth_client(user)
+        assert user_client.get('/api/v1/users/').status_code == 403
+        admin_client.patch(f'/api/v1/users/{user.username}/', data={'role': 'admin'})
+        assert user_client.get('/api/v1/users/').status_code == 200, (
+            'Проверьте, что изменение пользователя сразу сбрасывает его запись в кеше'
+        )
+        assert user_client.get('/api/v1/users/me/').json()['role'] == 'admin'
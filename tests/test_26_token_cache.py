@@ -0,0 +1,42 @@
+import time
+
+import pytest
+
+from .common import auth_client, create_users_api
+
+
+class Test26TokenCache:
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_cache_stats(self, admin_client):
+        user, _ = create_users_api(admin_client)
+        user_client = auth_client(user)
+        for _ in range(3):
+            user_client.get('/api/v1/users/me/')
+        assert user_client.get('/api/v1/auth/cache-stats/').status_code == 403, (
+            'Проверьте, что статистика кешей аутентификации доступна только администратору'
+        )
+        response = admin_client.get('/api/v1/auth/cache-stats/')
+        assert response.status_code == 200
+        tokens = response.json()['tokens']
+        assert tokens['misses'] == 2 and tokens['hits'] >= 3, (
+            'Проверьте, что повторный запрос с тем же токеном не проверяет его подпись заново'
+        )
+        assert 0 < tokens['hit_rate'] < 1 and tokens['time_saved'] > 0, (
+            'Проверьте, что статистика содержит долю попаданий и сэкономленное время'
+        )
+        assert response.json()['users']['hits'] >= 3
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_expired_and_invalid_tokens(self, client):
+        from api.authentication import token_cache
+
+        token_cache.set('expired', object(), time.time() - 1)
+        assert token_cache.get('expired') is None, (
+            'Проверьте, что токен удаляется из кеша по истечении срока действия'
+        )
+        response = client.get('/api/v1/users/me/', HTTP_AUTHORIZATION='Bearer invalid')
+        assert response.status_code == 401
+        assert token_cache.stats()['size'] == 0, (
+            'Проверьте, что недействительные токены не попадают в кеш'
+        )
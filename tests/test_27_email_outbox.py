@@ -0,0 +1,80 @@
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class Test27EmailOutbox:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_queued_signup_email(self, settings, client):
+        from users.models import OutboxEmail
+
+        settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'SEND_ON_COMMIT': False}
+        outbox_before_count = len(mail.outbox)
+        data = {'username': 'queued', 'email': 'queued@yamdb.fake'}
+        assert client.post(self.url_signup, data=data).status_code == 200
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что без `SEND_ON_COMMIT` письмо при регистрации не отправляется в запросе'
+        )
+        assert OutboxEmail.objects.filter(recipients=data['email']).count() == 1, (
+            'Проверьте, что при регистрации письмо записывается в очередь `OutboxEmail`'
+        )
+        call_command('send_outbox')
+        assert len(mail.outbox) == outbox_before_count + 1
+        assert mail.outbox[-1].to == [data['email']]
+        assert not OutboxEmail.objects.exists(), (
+            'Проверьте, что команда `send_outbox` удаляет отправленные письма из очереди'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_retry_with_backoff(self, settings, monkeypatch):
+        from django.core.mail import EmailMessage
+        from users.models import OutboxEmail
+        from users.outbox import drain_outbox, queue_email
+
+        settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'SEND_ON_COMMIT': False, 'RETRY_DELAY': 10}
+        queue_email('Subject', 'Body', 'from@yamdb.fake', ['to@yamdb.fake'])
+
+        def fail(message):
+            raise OSError('relay is down')
+
+        monkeypatch.setattr(EmailMessage, 'send', fail)
+        assert drain_outbox() == (0, 1)
+        email = OutboxEmail.objects.get()
+        assert email.attempts == 1 and 'relay is down' in email.last_error, (
+            'Проверьте, что неудачная отправка увеличивает счётчик попыток и сохраняет ошибку'
+        )
+        assert email.send_after > timezone.now(), (
+            'Проверьте, что неудачное письмо откладывается до следующей попытки'
+        )
+        assert drain_outbox() == (0, 0)
+
+        OutboxEmail.objects.update(send_after=timezone.now())
+        assert drain_outbox() == (0, 1)
+        delay = OutboxEmail.objects.get().send_after - timezone.now()
+        assert delay.total_seconds() > 15, (
+            'Проверьте, что задержка между попытками растёт экспоненциально'
+        )
+
+        monkeypatch.undo()
+        OutboxEmail.objects.update(send_after=timezone.now())
+        assert drain_outbox() == (1, 0)
+        assert not OutboxEmail.objects.exists()
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_claims_do_not_overlap(self, settings):
+        from users.models import OutboxEmail
+        from users.outbox import claim_batch, queue_email
+
+        settings.EMAIL_OUTBOX = {**settings.EMAIL_OUTBOX, 'SEND_ON_COMMIT': False}
+        for i in range(3):
+            queue_email('Subject', 'Body', 'from@yamdb.fake', [f'to{i}@yamdb.fake'])
+        first = claim_batch(OutboxEmail.objects.all(), 2)
+        second = claim_batch(OutboxEmail.objects.all(), 2)
+        assert len(first) == 2 and len(second) == 1, (
+            'Проверьте, что один и тот же батч писем не может быть захвачен двумя воркерами'
+        )
+        assert not {email.pk for email in first} & {email.pk for email in second}
+        assert claim_batch(OutboxEmail.objects.all(), 2) == []
@@ -0,0 +1,63 @@
+import pytest
+
+
+class Test28SignupLookup:
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_case_insensitive_conflicts(self, settings, client, user,
+                                           django_assert_num_queries):
+        from users.bloom import signup_filter
+
+        settings.SIGNUP_FILTER = {**settings.SIGNUP_FILTER, 'ENABLED': True}
+        signup_filter.rebuild()
+        data = {'username': user.username.upper(), 'email': 'other@yamdb.fake'}
+        with django_assert_num_queries(1):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == 400 and 'username' in response.json(), (
+            'Проверьте, что регистрация с занятым username в другом регистре возвращает статус 400 '
+            'и проверяется одним запросом'
+        )
+        data = {'username': 'other', 'email': user.email.upper()}
+        with django_assert_num_queries(1):
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == 400 and 'email' in response.json(), (
+            'Проверьте, что регистрация с занятым email в другом регистре возвращает статус 400'
+        )
+        response = client.post(self.url_signup, data={'username': user.username, 'email': user.email})
+        assert response.status_code == 200, (
+            'Проверьте, что повторная регистрация существующего пользователя отправляет код заново'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_lookup_uses_indexes(self, user):
+        from django.db.models import Q
+        from django.db.models.functions import Lower
+        from users.models import User
+
+        assert User.objects.signup_matches(user.username.upper(), 'nobody@yamdb.fake') == [user]
+        plan = (User.objects.annotate(username_lower=Lower('username'), email_lower=Lower('email'))
+                .filter(Q(username_lower='a') | Q(email_lower='b')).explain())
+        assert 'users_user_username_lower_idx' in plan and 'users_user_email_lower_idx' in plan, (
+            'Проверьте, что поиск при регистрации использует индексы по LOWER(username) и LOWER(email)'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_unique_ignoring_case(self, admin_client, user):
+        from django.db import IntegrityError, transaction
+        from users.models import User
+
+        with pytest.raises(IntegrityError), transaction.atomic():
+            User.objects.create(username=user.username.upper(), email='other@yamdb.fake')
+        with pytest.raises(IntegrityError), transaction.atomic():
+            User.objects.create(username='other', email=user.email.upper())
+        data = {'username': 'Ünïcode', 'email': 'unicode@yamdb.fake'}
+        response = admin_client.post('/api/v1/users/', data=data)
+        assert response.status_code == 400 and 'username' in response.json(), (
+            'Проверьте, что username вне ASCII отклоняется: LOWER() в SQLite не меняет его регистр'
+        )
+        data = {'username': 'other', 'email': user.email.upper()}
+        response = admin_client.post('/api/v1/users/', data=data)
+        assert response.status_code == 400 and 'email' in response.json(), (
+            'Проверьте, что администратор не может создать пользователя с занятым email в другом регистре'
+        )
@@ -0,0 +1,87 @@
+import pytest
+
+
+class Test29SignupFilter:
+    url_check = '/api/v1/auth/check-username/'
+    url_signup = '/api/v1/auth/signup/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_check_username(self, settings, client, user, django_assert_num_queries):
+        from users.bloom import BloomFilter, signup_filter
+
+        settings.SIGNUP_FILTER = {**settings.SIGNUP_FILTER, 'ENABLED': True}
+        signup_filter.rebuild()
+        with django_assert_num_queries(1):
+            response = client.get(self.url_check, {'username': 'FreshName'})
+        assert response.status_code == 200 and response.json()['available'], (
+            'Проверьте, что свободный username определяется одним запросом к базе данных'
+        )
+        # A user saved by another worker since the filter was built.
+        signup_filter.filter = BloomFilter(1000, 0.01)
+        response = client.get(self.url_check, {'username': user.username})
+        assert not response.json()['available'], (
+            'Проверьте, что промах фильтра не считается доказательством свободного username'
+        )
+        response = client.get(self.url_check, {'username': user.username.upper()})
+        assert response.status_code == 200 and not response.json()['available'], (
+            'Проверьте, что занятый username в другом регистре отмечается как недоступный'
+        )
+        assert client.get(self.url_check, {'username': 'me'}).status_code == 400
+        assert client.get(self.url_check).status_code == 400, (
+            'Проверьте, что запрос без username возвращает статус 400'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_filter_follows_signups(self, settings, client):
+        from users.bloom import BloomFilter, signup_filter
+
+        settings.SIGNUP_FILTER = {**settings.SIGNUP_FILTER, 'ENABLED': True}
+        signup_filter.rebuild()
+        data = {'username': 'Newcomer', 'email': 'Newcomer@yamdb.fake'}
+        assert client.post(self.url_signup, data=data).status_code == 200
+        assert signup_filter.might_exist('newcomer'), (
+            'Проверьте, что сохранённый пользователь добавляется в фильтр'
+        )
+        assert not client.get(self.url_check, {'username': 'newcomer'}).json()['available']
+        data = {'username': 'Other', 'email': 'newcomer@yamdb.fake'}
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == 400 and 'email' in response.json(), (
+            'Проверьте, что занятый email по-прежнему отклоняется при регистрации'
+        )
+
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'user{i}')
+        assert all(f'user{i}' in bloom for i in range(1000))
+        false_positives = sum(f'other{i}' in bloom for i in range(10000))
+        assert false_positives < 300, (
+            'Проверьте, что доля ложных срабатываний фильтра близка к заданной'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_stale_filter(self, settings, client, user, mailoutbox):
+        from users.bloom import BloomFilter, signup_filter
+
+        settings.SIGNUP_FILTER = {**settings.SIGNUP_FILTER, 'ENABLED': True}
+        signup_filter.rebuild()
+        # A user saved by another worker since the filter was built.
+        signup_filter.filter = BloomFilter(1000, 0.01)
+        data = {'username': user.username, 'email': user.email}
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == 200 and len(mailoutbox) == 1, (
+            'Проверьте, что повторная регистрация пользователя, пропущенного фильтром, '
+            'отправляет код заново'
+        )
+        data = {'username': user.username.upper(), 'email': 'other@yamdb.fake'}
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == 400 and 'username' in response.json(), (
+            'Проверьте, что username, пропущенный фильтром, отклоняется уникальным индексом'
+        )
+
+        settings.SIGNUP_FILTER = {**settings.SIGNUP_FILTER, 'REBUILD_INTERVAL': 0}
+        built = signup_filter.built
+        assert signup_filter.might_exist(user.username) is False, (
+            'Проверьте, что устаревший фильтр перестраивается вне запроса'
+        )
+        signup_filter.wait()
+        assert signup_filter.built > built and user.username.lower() in signup_filter.filter
@@ -0,0 +1,79 @@
+import pytest
+
+from .common import auth_client, create_titles
+
+
+class Test30Throttling:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+    url_throttles = '/api/v1/auth/throttles/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_signup_and_token(self, settings, client, admin_client):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+                'signup_ip': '3/hour', 'token_username': '2/hour',
+            },
+        }
+        for i in range(3):
+            data = {'username': f'storm{i}', 'email': f'storm{i}@yamdb.fake'}
+            assert client.post(self.url_signup, data=data).status_code == 200
+        data = {'username': 'storm3', 'email': 'storm3@yamdb.fake'}
+        response = client.post(self.url_signup, data=data)
+        assert response.status_code == 429, (
+            'Проверьте, что регистрация ограничивается по IP-адресу и возвращает статус 429'
+        )
+        assert int(response['Retry-After']) > 0
+        response = client.post(self.url_signup, data=data, HTTP_X_FORWARDED_FOR='10.0.0.1')
+        assert response.status_code == 429, (
+            'Проверьте, что заголовок X-Forwarded-For не позволяет обойти ограничение по IP-адресу'
+        )
+
+        data = {'username': 'storm0', 'confirmation_code': 'wrong'}
+        for _ in range(2):
+            assert client.post(self.url_token, data=data).status_code == 400
+        assert client.post(self.url_token, data=data).status_code == 429, (
+            'Проверьте, что подбор кода подтверждения ограничивается по username'
+        )
+
+        assert client.get(self.url_throttles).status_code == 401
+        response = admin_client.get(self.url_throttles, {'scope': 'token_username'})
+        assert response.status_code == 200
+        assert response.json() == [{
+            'key': 'token_username:storm0', 'scope': 'token_username',
+            'capacity': 2, 'tokens': 0, 'wait': response.json()[0]['wait'],
+        }], (
+            'Проверьте, что администратор видит текущее состояние ограничений'
+        )
+        assert response.json()[0]['wait'] > 0
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_writes_by_role(self, settings, admin_client, user, moderator):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {
+                **settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'],
+                'write_user': '1/hour', 'write_moderator': '2/hour',
+            },
+        }
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        user_client = auth_client(user)
+        data = {'text': 'Текст', 'score': 5}
+        assert user_client.post(url, data=data).status_code == 201
+        review_id = user_client.get(url).json()['results'][0]['id']
+        assert user_client.post(f'{url}{review_id}/comments/',
+                                data={'text': 'Ответ'}).status_code == 429, (
+            'Проверьте, что создание отзывов и комментариев ограничивается по роли пользователя'
+        )
+        assert user_client.get(url).status_code == 200, (
+            'Проверьте, что чтение не ограничивается'
+        )
+        moderator_client = auth_client(moderator)
+        assert moderator_client.post(url, data=data).status_code == 201
+        assert moderator_client.post(f'{url}{review_id}/comments/',
+                                     data={'text': 'Ответ'}).status_code == 201, (
+            'Проверьте, что для модераторов действует собственное ограничение'
+        )
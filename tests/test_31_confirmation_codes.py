@@ -0,0 +1,78 @@
+import datetime as dt
+
+import pytest
+from django.core import mail
+from django.core.management import call_command
+from django.utils import timezone
+
+
+class Test31ConfirmationCodes:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_code_lifecycle(self, client, django_assert_max_num_queries):
+        from users.models import ConfirmationCode
+
+        data = {'username': 'coder', 'email': 'coder@yamdb.fake'}
+        assert client.post(self.url_signup, data=data).status_code == 200
+        code = mail.outbox[-1].body
+        assert ConfirmationCode.objects.get().code == code, (
+            'Проверьте, что код подтверждения хранится в отдельной таблице'
+        )
+        with django_assert_max_num_queries(1):
+            response = client.post(self.url_token, data={'username': 'coder', 'confirmation_code': code})
+        assert response.status_code == 201 and 'token' in response.json(), (
+            'Проверьте, что верный код проверяется одним запросом и выдаёт токен'
+        )
+        response = client.post(self.url_token, data={'username': 'coder', 'confirmation_code': code})
+        assert response.status_code == 400, (
+            'Проверьте, что код подтверждения принимается только один раз'
+        )
+
+        ConfirmationCode.objects.update(expires=timezone.now() - dt.timedelta(seconds=1))
+        response = client.post(self.url_token, data={'username': 'coder', 'confirmation_code': code})
+        assert response.status_code == 400, (
+            'Проверьте, что просроченный код подтверждения не принимается'
+        )
+        assert client.post(self.url_signup, data=data).status_code == 200
+        old_code, code = code, mail.outbox[-1].body
+        assert code != old_code, (
+            'Проверьте, что повторная регистрация выдаёт новый случайный код'
+        )
+        response = client.post(self.url_token, data={'username': 'coder', 'confirmation_code': old_code})
+        assert response.status_code == 400, (
+            'Проверьте, что после повторной регистрации прежний код не принимается'
+        )
+        response = client.post(self.url_token, data={'username': 'coder', 'confirmation_code': code})
+        assert response.status_code == 201, (
+            'Проверьте, что повторная регистрация выдаёт новый код'
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_attempts_and_purge(self, settings, client, user):
+        from users.models import ConfirmationCode
+
+        settings.CONFIRMATION_CODES = {**settings.CONFIRMATION_CODES, 'MAX_ATTEMPTS': 2}
+        ConfirmationCode.objects.issue(user.pk, 'right')
+        for _ in range(2):
+            response = client.post(self.url_token, data={'username': user.username, 'confirmation_code': 'wrong'})
+            assert response.status_code == 400
+        response = client.post(self.url_token, data={'username': user.username, 'confirmation_code': 'right'})
+        assert response.status_code == 400, (
+            'Проверьте, что после исчерпания попыток код подтверждения не принимается'
+        )
+
+        ConfirmationCode.objects.issue(user.pk, 'right')
+        assert ConfirmationCode.objects.verify(user.username, 'right') == user.pk
+        assert ConfirmationCode.objects.verify(user.username, 'right') is None
+        assert call_command('purge_codes') == '1 confirmation codes were deleted.', (
+            'Проверьте, что использованный код подтверждения удаляется как просроченный'
+        )
+        ConfirmationCode.objects.issue(user.pk, 'right')
+        assert call_command('purge_codes') == '0 confirmation codes were deleted.'
+        ConfirmationCode.objects.update(expires=timezone.now())
+        assert call_command('purge_codes', batch_size=1) == '1 confirmation codes were deleted.', (
+            'Проверьте, что команда `purge_codes` удаляет просроченные коды'
+        )
+        assert not ConfirmationCode.objects.exists()
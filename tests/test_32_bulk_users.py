@@ -0,0 +1,70 @@
+import pytest
+
+from .common import auth_client, create_comments
+
+
+class Test32BulkUsers:
+    url_bulk = '/api/v1/users/bulk/'
+
+    @pytest.mark.django_db(transaction=True)
+    def test_01_set_role_and_deactivate(self, admin_client, admin, user, moderator,
+                                        django_assert_max_num_queries):
+        user_client = auth_client(user)
+        assert user_client.get('/api/v1/users/me/').status_code == 200
+        data = {'usernames': [user.username, moderator.username, 'ghost'],
+                'operation': 'set_role', 'role': 'moderator'}
+        assert user_client.post(self.url_bulk, data=data, format='json').status_code == 403
+        with django_assert_max_num_queries(6):
+            response = admin_client.post(self.url_bulk, data=data, format='json')
+        assert response.status_code == 200
+        assert response.json()['results'] == [
+            {'username': user.username, 'result': 'updated'},
+            {'username': moderator.username, 'result': 'unchanged'},
+            {'username': 'ghost', 'result': 'not_found'},
+        ], (
+            'Проверьте, что `/api/v1/users/bulk/` возвращает результат для каждого пользователя'
+        )
+        assert response.json()['invalidated']['users'] == [user.username]
+        user.refresh_from_db()
+        assert user.role == 'moderator'
+
+        data = {'usernames': [user.username, admin.username], 'operation': 'deactivate'}
+        response = admin_client.post(self.url_bulk, data=data, format='json')
+        assert response.json()['results'][1]['result'] == 'skipped', (
+            'Проверьте, что администратор не может применить массовую операцию к себе'
+        )
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что деактивированный пользователь сразу удаляется из кеша пользователей'
+        )
+        data = {'usernames': [user.username], 'operation': 'set_role'}
+        assert admin_client.post(self.url_bulk, data=data, format='json').status_code == 400
+
+    @pytest.mark.django_db(transaction=True)
+    def test_02_delete(self, settings, admin_client, admin):
+        from reviews.models import AuthorStats, Comment, Review, Title
+        from users.models import User
+
+        comments, reviews, titles, user, moderator = create_comments(admin_client, admin)
+        data = {'usernames': [user.username], 'operation': 'delete'}
+        response = admin_client.post(self.url_bulk, data=data, format='json')
+        assert response.json()['results'] == [{'username': user.username, 'result': 'deleted'}]
+        assert response.json()['invalidated']['titles'], (
+            'Проверьте, что ответ перечисляет произведения, чьи закешированные ответы сброшены'
+        )
+        assert not User.objects.filter(username=user.username).exists()
+        assert not Review.objects.filter(author__username=user.username).exists()
+        for review in Review.objects.all():
+            assert review.comment_count == Comment.objects.filter(review=review).count(), (
+                'Проверьте, что массовое удаление пересчитывает счётчики комментариев'
+            )
+        for title in Title.objects.all():
+            assert title.reviews.count() == title.review_count
+        assert not AuthorStats.objects.filter(user__username=user.username).exists()
+
+        settings.ASYNC_DELETION = True
+        data = {'usernames': [moderator.username], 'operation': 'delete'}
+        response = admin_client.post(self.url_bulk, data=data, format='json')
+        assert response.json()['results'] == [{'username': moderator.username, 'result': 'scheduled'}], (
+            'Проверьте, что с `ASYNC_DELETION` пользователи только скрываются до удаления'
+        )
+        assert User.objects.get(username=moderator.username).deleted_at is not None